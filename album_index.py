@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import hashlib
+
+from PyQt5.QtCore import QRunnable
+from PyQt5.QtGui import QImageReader
+
+from loader import SUPPORTED_FORMATS
+
+
+MANIFEST_VERSION = 2
+
+
+def natural_key(text):
+    """自然排序键：数字按数值比较，"品牌墙图片 (10)" 排在 "(9)" 之后"""
+    key = []
+    for part in re.split(r'(\d+)', text.lower()):
+        if part.isdigit():
+            key.append((0, int(part), part))
+        elif part:
+            key.append((1, 0, part))
+    return key
+
+
+def scan_files(folder_path, recursive=False):
+    """用 os.scandir 扫描图片文件，只取 stat 信息：路径 -> (修改时间, 文件大小)
+
+    返回的字典按相对路径自然排序。
+    """
+    found = []
+    pending = [folder_path]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if recursive and not entry.name.startswith('.'):
+                        pending.append(entry.path)
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in SUPPORTED_FORMATS:
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            found.append((entry.path, st.st_mtime_ns, st.st_size))
+    found.sort(key=lambda item: [natural_key(part) for part in
+                                 os.path.relpath(item[0], folder_path).split(os.sep)])
+    return {path: (mtime, size) for path, mtime, size in found}
+
+
+def probe_image(path):
+    """只读取文件头，得到尺寸、EXIF 方向和是否为动图；无法识别的文件返回 None"""
+    reader = QImageReader(path)
+    if not reader.canRead():
+        return None
+    size = reader.size()
+    if not size.isValid():
+        return None
+    return {'width': size.width(), 'height': size.height(),
+            'orientation': int(reader.transformation()),
+            'animated': reader.supportsAnimation()}
+
+
+class AlbumIndex:
+    """相册索引：扫描文件夹并维护持久化的清单（大小、修改时间、尺寸、方向、是否动图）
+
+    之后启动时只对文件做 stat，大小和修改时间都没变的文件直接使用清单中的信息；
+    损坏或无法识别的文件在探测文件头时就被剔除，不会进入解码队列。
+    """
+
+    def __init__(self, folder_path, recursive=False, manifest_dir=None, quarantine=None):
+        self.folder_path = folder_path
+        self.recursive = recursive
+        # 无法解码的文件清单（Quarantine），其中的文件不再进入图片列表
+        self.quarantine = quarantine
+        self.manifest_path = None
+        if manifest_dir:
+            ident = f"{os.path.abspath(folder_path)}|{recursive}"
+            name = hashlib.sha1(ident.encode('utf-8')).hexdigest() + '.json'
+            self.manifest_path = os.path.join(manifest_dir, name)
+        self.entries = {}  # 相对路径 -> 清单条目
+
+    def load(self):
+        """扫描文件夹并更新清单，返回按自然顺序排列的有效图片路径"""
+        manifest = self.read_manifest()
+        entries = {}
+        paths = []
+        dirty = False
+        for path, (mtime, size) in scan_files(self.folder_path, self.recursive).items():
+            rel_path = os.path.relpath(path, self.folder_path)
+            entry = manifest.get(rel_path)
+            if entry is None or entry.get('mtime_ns') != mtime or entry.get('size') != size:
+                # 新文件或已修改的文件才读取文件头
+                info = probe_image(path)
+                entry = {'mtime_ns': mtime, 'size': size, 'valid': info is not None}
+                if info is not None:
+                    entry.update(info)
+                dirty = True
+            entries[rel_path] = entry
+            if entry['valid'] and not (self.quarantine is not None
+                                       and self.quarantine.contains(path, mtime, size)):
+                paths.append(path)
+        if dirty or len(entries) != len(manifest):
+            self.write_manifest(entries)
+        self.entries = entries
+        return paths
+
+    def info(self, path):
+        """某张图片的清单条目"""
+        return self.entries.get(os.path.relpath(path, self.folder_path))
+
+    def read_manifest(self):
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取相册清单出错: {e}")
+            return {}
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('entries', {})
+
+    def write_manifest(self, entries):
+        """原子写入清单"""
+        if not self.manifest_path:
+            return
+        data = {
+            'version': MANIFEST_VERSION,
+            'folder': os.path.abspath(self.folder_path),
+            'recursive': self.recursive,
+            'entries': entries,
+        }
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            print(f"保存相册清单出错: {e}")
+
+
+class IndexTask(QRunnable):
+    """在线程池中加载相册索引，完成后通过名为 signal_name 的信号把图片路径列表交回 GUI 线程
+
+    guard 为信号所属对象的 EmitGuard，对象已销毁时丢弃结果。
+    """
+
+    def __init__(self, album_index, guard, signal_name):
+        super().__init__()
+        # 由调用方持有引用
+        self.setAutoDelete(False)
+        self.album_index = album_index
+        self.guard = guard
+        self.signal_name = signal_name
+
+    def run(self):
+        if self.guard.closed:
+            return
+        self.guard.emit(self.signal_name, self.album_index.load())
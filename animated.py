@@ -0,0 +1,56 @@
+from PyQt5.QtCore import QObject, QSize
+from PyQt5.QtGui import QImageReader, QMovie
+
+
+class MoviePlayer(QObject):
+    """在页面上播放动图（GIF），帧按需解码，不预先读入整个文件
+
+    只为停稳的当前页创建；翻页动画期间暂停，避免解码与其他区域的动画争抢 GUI 线程。
+    帧缓存有上限：全部帧缩放后的总字节数不超过 frame_cache_bytes 时才缓存所有帧，
+    否则每一帧都从文件流式解码。
+    """
+
+    def __init__(self, label, path, target_width, device_pixel_ratio, frame_cache_bytes, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.key = (path, target_width)  # 与页面的 image_key 对应
+        self.device_pixel_ratio = device_pixel_ratio
+        self.movie = QMovie(path, parent=self)
+        # 只读取文件头得到原始尺寸，与静态图片一样缩放到目标像素宽度并保持比例
+        size = QImageReader(path).size()
+        if size.isValid() and size.width() > 0 and size.height() > 0:
+            size = QSize(target_width, max(1, round(size.height() * target_width / size.width())))
+            self.movie.setScaledSize(size)
+        frame_bytes = max(size.width(), 0) * max(size.height(), 0) * 4
+        frame_count = self.movie.frameCount()
+        if 0 < frame_count and frame_count * frame_bytes <= frame_cache_bytes:
+            self.movie.setCacheMode(QMovie.CacheAll)
+        else:
+            self.movie.setCacheMode(QMovie.CacheNone)
+        self.movie.frameChanged.connect(self.on_frame)
+
+    def is_valid(self):
+        return self.movie.isValid()
+
+    def on_frame(self, frame_number):
+        pixmap = self.movie.currentPixmap()
+        if pixmap.isNull():
+            return
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        self.label.setPixmap(pixmap)
+
+    def play(self):
+        if self.movie.state() == QMovie.NotRunning:
+            self.movie.start()
+        elif self.movie.state() == QMovie.Paused:
+            self.movie.setPaused(False)
+
+    def pause(self):
+        if self.movie.state() == QMovie.Running:
+            self.movie.setPaused(True)
+
+    def stop(self):
+        """停止播放并释放解码器，页面保留最后显示的帧"""
+        self.movie.stop()
+        self.movie.frameChanged.disconnect(self.on_frame)
+        self.deleteLater()
@@ -0,0 +1,85 @@
+from PyQt5.QtCore import QObject, QTimer
+
+from metrics import metrics
+
+
+# 有区域正在翻页时，稍后重试的间隔（毫秒）
+RETRY_MS = 200
+
+
+class AttractScheduler(QObject):
+    """待机轮播：无人触摸一段时间后，各区域轮流自动翻到下一页
+
+    所有区域共用一个调度器，按顺序错开翻页，同一时间只有一个翻页动画；
+    下一张图片还没有解码完成的区域本轮跳过，自动翻页时 GUI 线程不需要等待解码。
+    """
+
+    def __init__(self, pagers, idle_ms=60000, interval_ms=8000, parent=None):
+        super().__init__(parent)
+        self.pagers = pagers
+        # 每个区域两次自动翻页的间隔，各区域之间平均错开
+        self.interval_ms = interval_ms
+        self.next_pager = 0  # 下一个轮到的区域
+        self.active = False
+
+        # 最后一次触摸之后的空闲时间
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(idle_ms)
+        self.idle_timer.timeout.connect(self.start)
+        self.idle_timer.start()
+
+        self.turn_timer = QTimer(self)
+        self.turn_timer.setSingleShot(True)
+        self.turn_timer.timeout.connect(self.turn)
+
+    def user_activity(self):
+        """有人触摸或点击：停止轮播，重新计算空闲时间"""
+        if self.active:
+            self.active = False
+            self.turn_timer.stop()
+        self.idle_timer.start()
+
+    def start(self):
+        self.active = True
+        for pager in self.pagers:
+            self.prewarm(pager)
+        self.turn_timer.start(self.step_ms())
+
+    def step_ms(self):
+        """相邻两次自动翻页（不同区域）之间的间隔"""
+        return max(self.interval_ms // max(len(self.pagers), 1), 1)
+
+    def turn(self):
+        """轮到的区域翻到下一页；有区域正在翻页时稍后重试"""
+        if not self.active:
+            return
+        if any(pager.is_busy() or pager.dragging for pager in self.pagers):
+            self.turn_timer.start(RETRY_MS)
+            return
+        for _ in range(len(self.pagers)):
+            pager = self.pagers[self.next_pager]
+            self.next_pager = (self.next_pager + 1) % len(self.pagers)
+            count = pager.page_count()
+            if count < 2:
+                continue
+            target = (pager.current_index + 1) % count
+            if not pager.page_ready(target):
+                # 下一张还没准备好，本轮跳过，下次轮到时再翻
+                self.prewarm(pager)
+                continue
+            pager.switch_to_page(target)
+            metrics.count('attract_turn', pager.name)
+            break
+        # 下一个轮到的区域提前解码它的下一张图片
+        if self.pagers:
+            self.prewarm(self.pagers[self.next_pager])
+        self.turn_timer.start(self.step_ms())
+
+    def prewarm(self, pager):
+        """确保区域的下一张图片已在解码队列中或已缓存"""
+        count = pager.page_count()
+        if count < 2 or pager.is_busy():
+            return
+        if not pager.page_ready((pager.current_index + 1) % count):
+            pager.request_images(pager.window_indices())
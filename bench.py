@@ -0,0 +1,245 @@
+"""离屏性能基准：启动、翻页、窗口尺寸变化和内存峰值
+
+用法：
+    python bench.py --images 200 --size 4000x3000 --format jpg --output bench_output.json
+
+默认使用 QT_QPA_PLATFORM=offscreen 在无显示器环境下运行，
+在临时目录生成合成相册和配置文件，结果写入 JSON 便于比较不同版本。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QElapsedTimer, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QFont
+from PyQt5.QtWidgets import QApplication
+
+from cache import shared_cache
+from metrics import metrics
+
+
+def peak_rss_mb():
+    """进程内存峰值（MB），平台不支持时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1048576
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1048576 if sys.platform == 'darwin' else peak / 1024
+
+
+def generate_album(folder, count, width, height, fmt):
+    """生成合成相册：每张图片颜色不同并带有编号，避免被压缩成过小的文件"""
+    os.makedirs(folder, exist_ok=True)
+    font = QFont()
+    font.setPixelSize(max(height // 6, 12))
+    for i in range(count):
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(QColor.fromHsv(i * 37 % 360, 180, 220))
+        painter = QPainter(image)
+        painter.setFont(font)
+        for row in range(0, height, max(height // 12, 1)):
+            painter.fillRect(0, row, width, max(height // 48, 1), QColor.fromHsv(i * 53 % 360, 120, 120))
+        painter.drawText(image.rect(), Qt.AlignCenter, str(i + 1))
+        painter.end()
+        image.save(os.path.join(folder, f"bench ({i + 1}).{fmt}"))
+
+
+def wait_until(app, condition, timeout_ms=60000):
+    """处理事件直到条件满足，返回耗时（毫秒），超时返回 None"""
+    timer = QElapsedTimer()
+    timer.start()
+    while not condition():
+        if timer.elapsed() > timeout_ms:
+            return None
+        app.processEvents()
+        time.sleep(0.001)
+    return timer.elapsed()
+
+
+def current_page_ready(pager):
+    """当前页已显示目标尺寸的图片（包括两步显示中的预览）"""
+    if pager.indexing:
+        return False
+    if not pager.image_paths or pager.scaled_width is None:
+        return not pager.image_paths
+    page = pager.live_pages.get(pager.current_index)
+    return page is not None and page.image_key == pager.image_key(pager.current_index)
+
+
+def window_ready(pager):
+    """窗口内所有页面都已显示目标尺寸、平滑缩放的图片"""
+    if pager.indexing:
+        return False
+    if not pager.image_paths or pager.scaled_width is None:
+        return not pager.image_paths
+    return all(pager.page_ready(index) for index in pager.live_pages)
+
+
+def summarize(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'avg_ms': sum(values) / len(values),
+        'p50_ms': values[len(values) // 2],
+        'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+        'max_ms': values[-1],
+    }
+
+
+def bench_startup(app, config_file):
+    """构造 MainWindow 的耗时，以及每个区域显示第一帧、填满窗口的耗时"""
+    from main import MainWindow
+    timer = QElapsedTimer()
+    timer.start()
+    window = MainWindow(config_file=config_file)
+    constructed = timer.elapsed()
+    first_frame = wait_until(app, lambda: all(current_page_ready(p) for p in window.pagers))
+    first_frame = None if first_frame is None else constructed + first_frame
+    window_filled = wait_until(app, lambda: all(window_ready(p) for p in window.pagers))
+    window_filled = None if window_filled is None or first_frame is None else first_frame + window_filled
+    return window, {
+        'construct_ms': constructed,
+        'first_frame_ms': first_frame,
+        'window_filled_ms': window_filled,
+    }
+
+
+def bench_page_turns(app, window, turns):
+    """连续翻页（包含循环回到第一张），统计每次翻页到停稳的耗时和动画帧间隔"""
+    metrics.reset()
+    settle = []
+    for pager in window.pagers:
+        count = pager.page_count()
+        if count < 2:
+            continue
+        for i in range(turns):
+            # 前 2/3 向后翻（经过末尾循环），其余向前翻
+            step = 1 if i < turns * 2 // 3 else -1
+            timer = QElapsedTimer()
+            timer.start()
+            pager.switch_to_page((pager.current_index + step) % count)
+            if wait_until(app, lambda: not pager.is_animating and window_ready(pager)) is None:
+                break
+            settle.append(timer.elapsed())
+    snapshot = metrics.snapshot()
+    frames = snapshot['timings'].get('frame', {})
+    return {
+        'turn_settle': summarize(settle),
+        'frame_avg_ms': frames.get('avg_ms'),
+        'frame_max_ms': frames.get('max_ms'),
+        'dropped_frames': snapshot['counters'].get('dropped_frame', 0),
+    }
+
+
+def bench_resize_storm(app, window, steps):
+    """连续改变窗口尺寸，统计期间事件循环的最长阻塞和尺寸稳定后重新缩放完成的耗时"""
+    window.showNormal()
+    base_width, height = max(window.width(), 1200), max(window.height(), 600)
+    longest = 0
+    timer = QElapsedTimer()
+    timer.start()
+    for i in range(steps):
+        step = QElapsedTimer()
+        step.start()
+        window.resize(base_width + (i % 10) * 24, height + (i % 7) * 16)
+        app.processEvents()
+        longest = max(longest, step.elapsed())
+    storm = timer.elapsed()
+    settled = wait_until(app, lambda: all(window_ready(p) and not p.resize_timer.isActive()
+                                          for p in window.pagers))
+    return {
+        'steps': steps,
+        'storm_ms': storm,
+        'longest_event_loop_block_ms': longest,
+        'settle_after_storm_ms': settled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离屏性能基准")
+    parser.add_argument('--images', type=int, default=60, help="每个相册的图片数")
+    parser.add_argument('--size', default='4000x3000', help="合成图片分辨率，如 4000x3000")
+    parser.add_argument('--format', default='jpg', choices=['jpg', 'png', 'bmp'], help="合成图片格式")
+    parser.add_argument('--albums', type=int, default=3, help="相册数（最多 3 个区域）")
+    parser.add_argument('--turns', type=int, default=30, help="每个区域的翻页次数")
+    parser.add_argument('--resize-steps', type=int, default=40, help="尺寸变化风暴的步数")
+    parser.add_argument('--engine', default='widget', help="动画引擎：widget 或 strip")
+    parser.add_argument('--workdir', default=None, help="合成相册目录，默认使用临时目录并在结束后删除")
+    parser.add_argument('--output', default='bench_output.json', help="结果文件（JSON）")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    app = QApplication(sys.argv[:1])
+    workdir = args.workdir or tempfile.mkdtemp(prefix='photo-bench-')
+    try:
+        album_keys = ['album_left', 'album_middle', 'album_right'][:max(1, min(args.albums, 3))]
+        config = {
+            'pager': {'prefetch_depth': 1},
+            # 缓存、清单和隔离名单都放在工作目录中，不读写当前目录下的 .cache
+            'cache': {'memory_mb': 256, 'disk_dir': os.path.join(workdir, 'cache'), 'disk_mb': 1024,
+                      'manifest_dir': os.path.join(workdir, 'manifests')},
+            'watchdog': {'quarantine_file': os.path.join(workdir, 'quarantine.json')},
+            'animation': {'engine': args.engine},
+            # 自适应降级会随机器负载改变缩放质量和预取深度，基准测试固定使用配置中的参数
+            'governor': {'enabled': False},
+        }
+        generate_started = time.perf_counter()
+        for key in album_keys:
+            folder = os.path.join(workdir, key)
+            if not os.path.isdir(folder):
+                generate_album(folder, args.images, width, height, args.format)
+            config[key] = {'name': key, 'path': folder}
+        generate_ms = (time.perf_counter() - generate_started) * 1000
+        config_file = os.path.join(workdir, 'config.json')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+
+        # 帧间隔等数据通过埋点收集，但不写日志文件
+        metrics.configure(True, log_dir=None)
+
+        results = {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args),
+            'generate_ms': generate_ms,
+        }
+        window, results['startup_cold'] = bench_startup(app, config_file)
+        results['page_turns'] = bench_page_turns(app, window, args.turns)
+        results['resize_storm'] = bench_resize_storm(app, window, args.resize_steps)
+        window.close()
+        window.deleteLater()
+
+        # 第二次启动：内存缓存清空，但磁盘缓存中已有预缩放版本
+        shared_cache.clear()
+        window, results['startup_warm_disk'] = bench_startup(app, config_file)
+        window.close()
+        results['cache'] = shared_cache.stats()
+        results['peak_rss_mb'] = peak_rss_mb()
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
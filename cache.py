@@ -0,0 +1,275 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QRunnable, QThreadPool
+from PyQt5.QtGui import QImage
+
+
+def image_cache_key(path, target_width, mtime=None):
+    """缓存键：(规范化路径, 文件修改时间, 目标宽度)
+
+    文件被替换后修改时间变化，旧的缓存项自然失效。
+    调用方已知修改时间（相册清单）时直接传入，不再访问文件系统。
+    """
+    if mtime is None:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+    return (os.path.normcase(os.path.abspath(path)), mtime, target_width)
+
+
+def pixmap_bytes(pixmap):
+    """估算一张 QPixmap/QImage 占用的字节数"""
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+def data_bytes(data):
+    """温层条目占用的字节数：QImage 或压缩后的字节串"""
+    if isinstance(data, QImage):
+        return data.sizeInBytes()
+    return len(data)
+
+
+class CompactStore:
+    """温层：离开窗口的页面以紧凑形式留在内存中，按字节预算做 LRU 淘汰
+
+    fmt 为 "rgb888" 时保存 24 位 QImage（比 32 位少四分之一），
+    为 "jpeg" 时重新编码为内存中的 JPEG 字节串（通常只有十分之一左右）。
+    读取在解码线程中进行，GUI 线程只负责交付，因此所有方法都是线程安全的。
+    超出预算的条目直接丢弃，需要时从磁盘缓存（冷层）或原图重新加载。
+    """
+
+    def __init__(self, budget_bytes=0, fmt='rgb888', quality=85):
+        self.budget_bytes = budget_bytes
+        self.fmt = fmt
+        self.quality = quality
+        self.entries = OrderedDict()  # 键 -> QImage 或 bytes，最近使用的在末尾
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def configure(self, budget_bytes, fmt='rgb888', quality=85):
+        self.fmt = fmt
+        self.quality = quality
+        with self.lock:
+            self.budget_bytes = max(0, int(budget_bytes))
+            self.evict()
+
+    def enabled(self):
+        return self.budget_bytes > 0
+
+    def compact(self, image):
+        """把图片转换为紧凑形式；带透明通道的图片保留 32 位"""
+        if image.hasAlphaChannel():
+            return image
+        if self.fmt == 'jpeg':
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            if image.save(buffer, 'JPG', self.quality):
+                return bytes(data)
+        return image.convertToFormat(QImage.Format_RGB888)
+
+    def put(self, key, image):
+        """压缩后放入温层（耗时，在工作线程中调用）"""
+        if not self.enabled() or image.isNull():
+            return
+        data = self.compact(image)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= data_bytes(self.entries.pop(key))
+            self.entries[key] = data
+            self.total_bytes += data_bytes(data)
+            self.evict()
+
+    def load(self, key):
+        """读取温层中的图片，未命中时返回空 QImage"""
+        with self.lock:
+            data = self.entries.get(key)
+            if data is None:
+                return QImage()
+            self.entries.move_to_end(key)
+        if isinstance(data, QImage):
+            return data
+        return QImage.fromData(data, 'JPG')
+
+    def evict(self):
+        while self.entries and self.total_bytes > self.budget_bytes:
+            _, data = self.entries.popitem(last=False)
+            self.total_bytes -= data_bytes(data)
+
+    def discard_path(self, path):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == path]:
+                self.total_bytes -= data_bytes(self.entries.pop(key))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+class CompactTask(QRunnable):
+    """在线程池中把降级的页面压缩后放入温层"""
+
+    def __init__(self, store, key, image):
+        super().__init__()
+        self.store = store
+        self.key = key
+        self.image = image
+
+    def run(self):
+        self.store.put(self.key, self.image)
+
+
+class PixmapCache:
+    """进程内共享的缩放图片缓存，按字节预算做 LRU 淘汰
+
+    只在 GUI 线程中使用，所有分页器共用一个实例。可以为单个区域设置份额上限，
+    超出份额时先淘汰该区域自己最久未使用的条目，避免一个大相册挤掉其他区域的缓存。
+
+    这是分层存储中的热层（可以直接绘制的 QPixmap）。每个区域通过 set_hot 声明
+    当前页附近的热窗口，不在任何区域热窗口内的条目降级到温层（warm，紧凑的
+    QImage 或 JPEG 字节串）；预算和份额只限制热窗口本身。温层装不下时只留在冷层（磁盘缓存）中。
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # 键 -> QPixmap，最近使用的在末尾
+        self.total_bytes = 0
+        self.owners = {}  # 键 -> 放入该条目的区域
+        self.owner_bytes = {}  # 区域 -> 占用字节数
+        self.quotas = {}  # 区域 -> 份额上限（字节），未设置的区域不单独限制
+        self.hot_keys = {}  # 区域 -> 该区域热窗口内的键
+        self.warm = CompactStore()  # 温层，预算为 0 时关闭
+        self.cold = None  # 冷层（DiskCache），只用于统计占用
+        self.shared = None  # 跨进程共享存储（SharedImageStore），条目持有映射的引用
+        # 命中/未命中/淘汰计数，用于确定预算大小
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.demotions = 0  # 离开热窗口而降级的条目数
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = max(0, int(budget_bytes))
+        self.evict()
+
+    def set_quota(self, owner, budget_bytes):
+        """设置某个区域的份额上限，None 表示取消限制"""
+        if budget_bytes is None:
+            self.quotas.pop(owner, None)
+        else:
+            self.quotas[owner] = max(0, int(budget_bytes))
+            self.evict(owner)
+
+    def get(self, key):
+        pixmap = self.entries.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap, owner=None):
+        if key in self.entries:
+            self.remove(key)
+        self.entries[key] = pixmap
+        if self.shared is not None:
+            self.shared.acquire(pixmap)
+        self.owners[key] = owner
+        size = pixmap_bytes(pixmap)
+        self.total_bytes += size
+        self.owner_bytes[owner] = self.owner_bytes.get(owner, 0) + size
+        self.evict(owner)
+
+    def set_hot(self, owner, keys):
+        """更新区域的热窗口，不在任何区域热窗口内的条目降级到温层
+
+        多个区域显示同一张图片时，只要有一个区域仍需要，条目就留在热层；
+        尚未登记热窗口的区域放入的条目不受影响。
+        """
+        self.hot_keys[owner] = set(keys)
+        wanted = set().union(*self.hot_keys.values())
+        for key in [key for key in self.entries
+                    if key not in wanted and self.owners.get(key) in self.hot_keys]:
+            self.demote(key)
+            self.demotions += 1
+
+    def demote(self, key):
+        """把热层条目降级到温层（离开热窗口或被淘汰时调用），温层关闭时只从热层移除"""
+        if key not in self.entries:
+            return
+        pixmap = self.entries[key]
+        # 映射的图片仍在共享目录中，重新映射比温层更快，不再压缩一份
+        shared = self.shared is not None and self.shared.owns(pixmap)
+        self.remove(key)
+        if self.warm.enabled() and not shared:
+            # 转换为 QImage 不复制像素，压缩在线程池中进行
+            QThreadPool.globalInstance().start(CompactTask(self.warm, key, pixmap.toImage()), -1)
+
+    def remove(self, key):
+        pixmap = self.entries.pop(key)
+        if self.shared is not None:
+            self.shared.release(pixmap)
+        owner = self.owners.pop(key, None)
+        size = pixmap_bytes(pixmap)
+        self.total_bytes -= size
+        self.owner_bytes[owner] = self.owner_bytes.get(owner, 0) - size
+
+    def evict(self, owner=None):
+        """淘汰最久未使用的条目：先让该区域回到份额以内，再让总量回到预算以内"""
+        quota = self.quotas.get(owner)
+        if quota is not None and self.owner_bytes.get(owner, 0) > quota:
+            for key in [key for key in self.entries if self.owners.get(key) == owner]:
+                if self.owner_bytes.get(owner, 0) <= quota:
+                    break
+                self.demote(key)
+                self.evictions += 1
+        while self.entries and self.total_bytes > self.budget_bytes:
+            self.demote(next(iter(self.entries)))
+            self.evictions += 1
+
+    def discard_path(self, path):
+        """删除某个文件的所有缓存项（文件被修改或删除时调用）"""
+        path = os.path.normcase(os.path.abspath(path))
+        for key in [key for key in self.entries if key[0] == path]:
+            self.remove(key)
+        self.warm.discard_path(path)
+
+    def clear(self):
+        self.warm.clear()
+        self.hot_keys.clear()
+        if self.shared is not None:
+            for pixmap in self.entries.values():
+                self.shared.release(pixmap)
+        self.entries.clear()
+        self.owners.clear()
+        self.owner_bytes.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        """缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'budget_bytes': self.budget_bytes,
+            'owner_bytes': {str(owner): size for owner, size in self.owner_bytes.items() if size},
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'demotions': self.demotions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            # 各层占用的字节数：热层 QPixmap、温层紧凑图片、冷层磁盘缓存
+            'tiers': {
+                'hot': self.total_bytes,
+                'warm': self.warm.total_bytes,
+                'cold': self.cold.total_bytes if self.cold is not None else 0,
+            },
+        }
+
+
+# 所有分页器共享的缓存实例，预算由 MainWindow 根据 config.json 设置
+shared_cache = PixmapCache()
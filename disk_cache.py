@@ -0,0 +1,130 @@
+import os
+import hashlib
+import threading
+
+from PyQt5.QtGui import QImage
+
+
+def prune_directory(directory, max_bytes):
+    """目录超出容量时，删除最久未更新的文件，返回清理后的总字节数
+
+    其他线程或进程可能同时写入：正在写入的临时文件不计入也不删除，
+    扫描期间消失的文件直接跳过。
+    """
+    entries = []
+    total = 0
+    try:
+        scanned = list(os.scandir(directory))
+    except OSError as e:
+        print(f"扫描缓存目录出错: {e}")
+        return 0
+    for entry in scanned:
+        if entry.name.endswith('.tmp'):
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry.path))
+        total += st.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+
+def remove_file(path):
+    """删除文件（清理临时文件），文件不存在或无法删除时忽略"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class DiskCache:
+    """持久化的缩放图片缓存（显示尺寸的预缩放版本）
+
+    文件名由 源文件路径 + 修改时间 + 文件大小 + 目标宽度 计算得出，
+    源文件被替换或屏幕尺寸变化时自动使用新的文件名，旧文件由 prune 清理。
+    load/store 可以在工作线程中调用。
+    """
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # 目录占用的字节数（冷层统计），启动时清理一次后得到准确值
+        self.total_bytes = 0
+        # store 在多个解码线程中调用，统计值的更新需要加锁
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def entry_name(self, source_path, target_width):
+        """缓存文件名（不含扩展名），源文件不存在时返回 None"""
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        ident = f"{os.path.abspath(source_path)}|{st.st_mtime_ns}|{st.st_size}|{target_width}"
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+    def contains(self, source_path, target_width):
+        """是否已有该图片、该宽度的缩放版本（只检查文件是否存在）"""
+        name = self.entry_name(source_path, target_width)
+        if name is None:
+            return False
+        return any(os.path.exists(os.path.join(self.directory, name + ext)) for ext in ('.jpg', '.png'))
+
+    def load(self, source_path, target_width):
+        """读取缓存的缩放版本，未命中时返回空 QImage"""
+        name = self.entry_name(source_path, target_width)
+        if name is None:
+            return QImage()
+        for ext in ('.jpg', '.png'):
+            cached_path = os.path.join(self.directory, name + ext)
+            if os.path.exists(cached_path):
+                image = QImage(cached_path)
+                if not image.isNull():
+                    return image
+        return QImage()
+
+    def store(self, source_path, target_width, image):
+        """原子写入缩放版本：先写临时文件再重命名，避免读到半个文件"""
+        name = self.entry_name(source_path, target_width)
+        if name is None or image.isNull():
+            return False
+        # 带透明通道的图片用 PNG，其余用 JPEG
+        if image.hasAlphaChannel():
+            ext, fmt, quality = '.png', 'PNG', -1
+        else:
+            ext, fmt, quality = '.jpg', 'JPG', 92
+        cached_path = os.path.join(self.directory, name + ext)
+        tmp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if not image.save(tmp_path, fmt, quality):
+                return False
+            size = os.path.getsize(tmp_path)
+            with self.lock:
+                # 覆盖已有的文件时只计入大小的差值
+                old_size = os.path.getsize(cached_path) if os.path.exists(cached_path) else 0
+                os.replace(tmp_path, cached_path)
+                self.total_bytes += size - old_size
+            return True
+        except OSError as e:
+            print(f"写入缓存文件出错: {e}")
+            return False
+        finally:
+            remove_file(tmp_path)
+
+    def prune(self):
+        """缓存目录超出容量时，删除最久未更新的文件"""
+        total = prune_directory(self.directory, self.max_bytes)
+        with self.lock:
+            self.total_bytes = total
@@ -0,0 +1,133 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+from metrics import metrics
+
+
+# 降级的各个等级，逐级叠加：
+# 1 翻页过程中快速缩放；2 翻页动画缩短；3 不再预取窗口外的页面
+LEVELS = ('full', 'fast_scaling', 'short_slides', 'no_prefetch')
+
+
+class QualityGovernor(QObject):
+    """自适应质量调节：翻页卡顿或解码队列积压时逐级降低质量，恢复余量后逐级还原
+
+    定期统计各区域翻页动画的帧间隔（取 90 分位）和所有区域解码队列的总长度。
+    帧间隔超过目标的 degrade_ratio 倍，或翻页期间队列超过 queue_high 时降一级；
+    帧间隔低于目标的 restore_ratio 倍、队列不超过 queue_low 并持续 restore_after_ms 后升一级。
+    降级只修改分页器的运行参数，配置文件中的原始值保存在 baseline 中。
+    """
+
+    def __init__(self, pagers, target_fps=60, interval_ms=500, degrade_ratio=1.5,
+                 restore_ratio=1.15, queue_high=6, queue_low=1, restore_after_ms=3000,
+                 min_frames=5, duration_scale=0.6, parent=None):
+        super().__init__(parent)
+        self.pagers = pagers
+        self.frame_budget = 1000 / target_fps
+        self.degrade_ratio = degrade_ratio
+        self.restore_ratio = restore_ratio
+        self.queue_high = queue_high
+        self.queue_low = queue_low
+        self.restore_after = restore_after_ms / 1000
+        self.min_frames = min_frames  # 帧数太少时不据此判断
+        self.duration_scale = duration_scale
+        self.level = 0
+        self.headroom_since = None  # 开始有余量的时间（time.monotonic）
+        self.intervals = []  # 本统计周期内的帧间隔（毫秒）
+        self.last_frame = {}  # 区域 -> 上一帧时间
+        # 各分页器配置的原始参数，还原时使用
+        self.baseline = {pager: (dict(pager.scaling), pager.slide_duration, pager.prefetch_depth)
+                         for pager in pagers}
+        for pager in pagers:
+            pager.animation_frame.connect(lambda pager=pager: self.on_frame(pager))
+            pager.busy_changed.connect(lambda busy, pager=pager: self.on_busy(pager, busy))
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.evaluate)
+        self.timer.start(interval_ms)
+
+    def on_frame(self, pager):
+        now = time.perf_counter()
+        last = self.last_frame.get(pager)
+        self.last_frame[pager] = now
+        if last is not None:
+            self.intervals.append((now - last) * 1000)
+
+    def on_busy(self, pager, busy):
+        """翻页结束后清除帧时钟，两段动画之间的空闲不计入帧间隔"""
+        if not busy:
+            self.last_frame.pop(pager, None)
+
+    def queue_depth(self):
+        return sum(pager.loader.pending_count() for pager in self.pagers)
+
+    def evaluate(self):
+        intervals, self.intervals = sorted(self.intervals), []
+        frame_ms = None
+        if len(intervals) >= self.min_frames:
+            frame_ms = intervals[int(len(intervals) * 0.9)]
+        queue = self.queue_depth()
+
+        slow = frame_ms is not None and frame_ms > self.frame_budget * self.degrade_ratio
+        # 队列积压只在有翻页动画时才算压力，启动和停稳后的解码不影响帧率
+        backlog = bool(intervals) and queue > self.queue_high
+        if slow or backlog:
+            self.headroom_since = None
+            level = self.next_level(1)
+            if level is not None:
+                reason = f"帧间隔 {frame_ms:.1f} ms" if slow else f"解码队列 {queue}"
+                self.set_level(level, reason)
+            return
+
+        smooth = frame_ms is None or frame_ms < self.frame_budget * self.restore_ratio
+        if not smooth or queue > self.queue_low or self.level == 0:
+            self.headroom_since = None
+            return
+        now = time.monotonic()
+        if self.headroom_since is None:
+            self.headroom_since = now
+        elif now - self.headroom_since >= self.restore_after:
+            # 每升一级都重新计时，避免一次还原过多又立刻卡顿
+            self.headroom_since = now
+            self.set_level(self.next_level(-1), "恢复余量")
+
+    def next_level(self, step):
+        """沿 step 方向的下一个等级，跳过对所有分页器都不起作用的等级；没有则返回 None"""
+        level = self.level + step
+        while 0 < level < len(LEVELS) and not self.takes_effect(level):
+            level += step
+        return level if 0 <= level < len(LEVELS) else None
+
+    def takes_effect(self, level):
+        """该等级是否会改变某个分页器的参数（例如配置中翻页时已是快速缩放，第 1 级没有意义）"""
+        for scaling, slide_duration, prefetch_depth in self.baseline.values():
+            if level == 1 and scaling.get('animating') != 'fast':
+                return True
+            if level == 2 and int(slide_duration * self.duration_scale) != slide_duration:
+                return True
+            if level == 3 and prefetch_depth > 0:
+                return True
+        return False
+
+    def set_level(self, level, reason=''):
+        self.level = level
+        for pager in self.pagers:
+            self.apply(pager)
+        metrics.count('quality_level', '', f"{LEVELS[level]}: {reason}")
+        metrics.set_governor({'level': level, 'mode': LEVELS[level], 'reason': reason})
+
+    def apply(self, pager):
+        """按当前等级设置分页器的缩放质量、动画时长和预取深度"""
+        scaling, slide_duration, prefetch_depth = self.baseline[pager]
+        pager.scaling = dict(scaling)
+        if self.level >= 1:
+            pager.scaling['animating'] = 'fast'
+        pager.slide_duration = slide_duration
+        if self.level >= 2:
+            pager.slide_duration = int(slide_duration * self.duration_scale)
+        prefetch = 0 if self.level >= 3 else prefetch_depth
+        if prefetch != pager.prefetch_depth:
+            pager.prefetch_depth = prefetch
+            if not pager.is_busy():
+                # 停稳的区域立即回收或补齐窗口内的页面；翻页中的区域在翻页结束时处理
+                pager.refresh_window()
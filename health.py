@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from metrics import metrics
+
+
+class Quarantine:
+    """无法解码的文件清单，持久化保存，索引时跳过这些文件
+
+    以 (修改时间, 文件大小) 记录；文件被替换后自动解除隔离，重新尝试加载。
+    索引在工作线程中进行，所有方法都是线程安全的。
+    """
+
+    def __init__(self, path=None):
+        self.path = path  # 为空时只保存在内存中
+        self.lock = threading.Lock()
+        self.entries = {}  # 规范化路径 -> {mtime_ns, size, reason, time}
+        self.load()
+
+    def key(self, path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def contains(self, path, mtime_ns=None, size=None):
+        """文件是否处于隔离中（未传入 stat 信息时读取文件）"""
+        with self.lock:
+            entry = self.entries.get(self.key(path))
+        if entry is None:
+            return False
+        if mtime_ns is None or size is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            mtime_ns, size = st.st_mtime_ns, st.st_size
+        return entry['mtime_ns'] == mtime_ns and entry['size'] == size
+
+    def add(self, path, reason=''):
+        """隔离一个文件，返回是否为新加入的"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if self.contains(path, st.st_mtime_ns, st.st_size):
+            return False
+        with self.lock:
+            self.entries[self.key(path)] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                                            'reason': reason, 'time': time.time()}
+        self.save()
+        return True
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, ValueError) as e:
+            print(f"读取隔离清单出错: {e}")
+
+    def save(self):
+        """原子写入隔离清单"""
+        if not self.path:
+            return
+        with self.lock:
+            data = {'entries': dict(self.entries)}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存隔离清单出错: {e}")
+
+
+class Watchdog(QObject):
+    """看门狗：定期检查每个区域的状态并自动恢复
+
+    - 翻页动画超过预定时间仍未结束（finished 没有触发）时强制完成；
+    - 拖动长时间没有新的触摸事件（松手事件丢失）时取消拖动；
+    - 解码失败的文件放入隔离清单，并从所有显示它的区域中移除。
+    所有事件都计入性能日志，区域的健康状态写入汇总。
+    """
+
+    # 拖动被取消，参数为分页器；主窗口据此清除该区域的触摸点
+    drag_cancelled = pyqtSignal(object)
+
+    def __init__(self, pagers, quarantine, interval_ms=500, grace_ms=1000,
+                 drag_timeout_ms=10000, parent=None):
+        super().__init__(parent)
+        self.pagers = pagers
+        self.quarantine = quarantine
+        self.grace = grace_ms / 1000
+        self.drag_timeout = drag_timeout_ms / 1000
+        self.health = {}  # 区域 -> 各类恢复事件的次数
+        for pager in pagers:
+            self.health[pager.name] = {'stuck_animations': 0, 'stuck_drags': 0, 'quarantined': 0}
+            pager.decode_failed.connect(lambda path, pager=pager: self.on_decode_failed(pager, path))
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(interval_ms)
+
+    def check(self):
+        now = time.monotonic()
+        for pager in self.pagers:
+            if pager.is_animating and pager.animation_deadline is not None \
+                    and now > pager.animation_deadline + self.grace:
+                pager.force_settle()
+                self.report(pager, 'stuck_animations', 'watchdog_animation',
+                            f"翻页动画超时，已强制完成（第 {pager.current_index + 1} 页）")
+            if pager.dragging and now - pager.drag_samples[-1][0] > self.drag_timeout:
+                pager.cancel_drag()
+                self.drag_cancelled.emit(pager)
+                self.report(pager, 'stuck_drags', 'watchdog_drag', "拖动长时间无响应，已取消")
+
+    def on_decode_failed(self, pager, path):
+        """解码失败：隔离该文件，并从所有区域的图片列表中移除"""
+        if not self.quarantine.add(path, 'decode'):
+            return
+        self.report(pager, 'quarantined', 'quarantine', f"无法解码，已隔离: {path}")
+        for other in self.pagers:
+            if path in other.image_paths:
+                other.apply_album_diff([], [path], [])
+
+    def report(self, pager, field, kind, message):
+        self.health[pager.name][field] += 1
+        print(f"[看门狗] {pager.name}: {message}")
+        metrics.count(kind, pager.name, message)
+        metrics.set_health(pager.name, self.health[pager.name])
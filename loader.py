@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler
+
+from cache import image_cache_key
+from metrics import metrics
+
+
+# 支持的图片格式
+SUPPORTED_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
+
+# 解码质量，数值越大质量越高：
+# PREVIEW 按目标宽度的 1/PREVIEW_SCALE 解码后快速放大，FAST 快速缩放，SMOOTH 平滑缩放
+PREVIEW, FAST, SMOOTH = 0, 1, 2
+PREVIEW_SCALE = 4
+
+
+def decode_scaled(path, target_width, transform=Qt.SmoothTransformation, decode_width=None):
+    """解码图片并缩放到目标宽度（保持比例），失败时返回空 QImage
+
+    先读取文件头得到原始尺寸，比目标大时让解码器直接按缩小后的尺寸解码
+    （JPEG 会在 DCT 域缩小），大幅降低超大原图的解码时间和峰值内存。
+    decode_width 小于目标宽度时按该宽度解码再放大，用于快速预览。
+    只使用 QImage，可以在工作线程中安全调用。
+    """
+    decode_width = decode_width or target_width
+    reader = QImageReader(path)
+    # 按 EXIF 方向信息自动旋转
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and size.width() > 0 and size.height() > 0:
+        # setScaledSize 作用于旋转之前的图像，旋转 90 度时宽高互换
+        rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+        display_width = size.height() if rotated else size.width()
+        if display_width > decode_width:
+            scale = decode_width / display_width
+            reader.setScaledSize(QSize(max(1, round(size.width() * scale)),
+                                       max(1, round(size.height() * scale))))
+    started = time.perf_counter()
+    image = reader.read()
+    metrics.record('decode', (time.perf_counter() - started) * 1000, detail=os.path.basename(path))
+    if image.isNull() or image.width() == 0:
+        return QImage()
+    if image.width() == target_width:
+        return image
+    # 按宽度缩放并保持比例，避免先取整高度再缩放导致宽度少一个像素
+    started = time.perf_counter()
+    image = image.scaledToWidth(target_width, transform)
+    metrics.record('scale', (time.perf_counter() - started) * 1000, detail=os.path.basename(path))
+    return image
+
+
+class EmitGuard:
+    """工作线程向 QObject 发信号前的保护：对象被销毁后不再发出
+
+    对象的 destroyed 信号与 emit 使用同一把锁，正在发出时销毁会等待发出完成，
+    销毁之后的 emit 直接丢弃，不会访问已删除的 C++ 对象。
+    信号按名称传入，在确认对象仍然存在之后才从对象上取得。
+    """
+
+    def __init__(self, owner):
+        self.lock = threading.Lock()
+        self.closed = False
+        self.owner = owner
+        owner.destroyed.connect(self.close)
+
+    def close(self, *args):
+        with self.lock:
+            self.closed = True
+
+    def emit(self, name, *args):
+        """对象仍然存在时发出名为 name 的信号，返回是否已发出"""
+        with self.lock:
+            if self.closed:
+                return False
+            try:
+                getattr(self.owner, name).emit(*args)
+            except RuntimeError:
+                # 对象已删除但 destroyed 尚未处理（例如随父对象一起销毁）
+                self.closed = True
+                return False
+            return True
+
+
+class DecodeTask(QRunnable):
+    """在线程池中解码并缩放一张图片"""
+
+    def __init__(self, loader, path, target_width, quality=SMOOTH):
+        super().__init__()
+        # 由 ImageLoader 持有引用，避免 Python 对象在运行中被回收
+        self.setAutoDelete(False)
+        self.loader = loader
+        self.path = path
+        self.target_width = target_width
+        self.quality = quality
+        self.result_quality = quality  # 命中缓存时得到的是平滑缩放的版本
+        self.cancelled = False
+
+    def key(self):
+        return (self.path, self.target_width, self.quality)
+
+    def run(self):
+        if self.cancelled or self.loader.guard.closed:
+            return
+        disk_cache = self.loader.disk_cache
+        shared_store = self.loader.shared_store
+        warm_store = self.loader.warm_store
+        image = QImage()
+        if warm_store is not None and warm_store.enabled():
+            # 温层：本进程之前显示过、离开窗口后压缩保存的版本
+            started = time.perf_counter()
+            image = warm_store.load(image_cache_key(self.path, self.target_width))
+            if not image.isNull():
+                metrics.record('warm_load', (time.perf_counter() - started) * 1000,
+                               detail=os.path.basename(self.path))
+        if image.isNull() and shared_store is not None:
+            # 其他进程已解码过的图片直接映射使用
+            started = time.perf_counter()
+            image = shared_store.load(self.path, self.target_width)
+            if not image.isNull():
+                metrics.record('shared_load', (time.perf_counter() - started) * 1000,
+                               detail=os.path.basename(self.path))
+        if image.isNull() and disk_cache is not None:
+            # 优先读取磁盘上的预缩放版本，避免重新解码原图
+            started = time.perf_counter()
+            image = disk_cache.load(self.path, self.target_width)
+            if not image.isNull():
+                metrics.record('disk_load', (time.perf_counter() - started) * 1000,
+                               detail=os.path.basename(self.path))
+        if not image.isNull():
+            self.result_quality = SMOOTH
+        elif self.quality == PREVIEW:
+            image = decode_scaled(self.path, self.target_width, Qt.FastTransformation,
+                                  max(1, self.target_width // PREVIEW_SCALE))
+        else:
+            smooth = self.quality == SMOOTH
+            image = decode_scaled(self.path, self.target_width,
+                                  Qt.SmoothTransformation if smooth else Qt.FastTransformation)
+            # 快速缩放的结果只临时显示，不写入缓存
+            if disk_cache is not None and smooth and not image.isNull():
+                disk_cache.store(self.path, self.target_width, image)
+            if shared_store is not None and smooth and not image.isNull():
+                # 发布给同一主机上的其他进程，本进程也改用映射的版本
+                image = shared_store.store(self.path, self.target_width, image)
+        # 解码期间可能已被取消，结果直接丢弃
+        if not self.cancelled:
+            self.loader.guard.emit('task_done', self, image)
+
+
+class ImageLoader(QObject):
+    """后台图片加载器：在线程池中解码为 QImage，结果通过 loaded 信号回到 GUI 线程"""
+
+    # 图片路径、目标宽度、结果质量（PREVIEW/FAST/SMOOTH）、解码结果（失败时为空 QImage）
+    loaded = pyqtSignal(str, int, int, QImage)
+    # 工作线程 -> GUI 线程的内部信号
+    task_done = pyqtSignal(object, QImage)
+
+    def __init__(self, parent=None, pool=None, disk_cache=None, shared_store=None, warm_store=None):
+        super().__init__(parent)
+        # 所有分页器默认共享同一个全局线程池
+        self.pool = pool or QThreadPool.globalInstance()
+        # 可选的磁盘缓存（DiskCache），冷启动时直接读取预缩放版本
+        self.disk_cache = disk_cache
+        # 可选的跨进程共享存储（SharedImageStore），多个实例共用解码结果
+        self.shared_store = shared_store
+        # 可选的温层（CompactStore），离开窗口的页面以紧凑形式留在内存中
+        self.warm_store = warm_store
+        self.pending = {}  # (路径, 宽度, 质量) -> DecodeTask
+        self.task_done.connect(self.on_task_done)
+        # 分页器关闭时可能仍有任务在运行，销毁后不再向本对象发信号
+        self.guard = EmitGuard(self)
+
+    def request(self, path, target_width, priority=0, quality=SMOOTH):
+        """提交解码任务，相同的图片、尺寸和质量已在队列中时不重复提交"""
+        key = (path, target_width, quality)
+        if key in self.pending:
+            return
+        task = DecodeTask(self, path, target_width, quality)
+        self.pending[key] = task
+        self.pool.start(task, priority)
+
+    def cancel_except(self, keep_keys):
+        """取消 (路径, 宽度) 不在 keep_keys 中的任务：未开始的直接移出队列，已开始的丢弃结果"""
+        for key in list(self.pending):
+            if key[:2] in keep_keys:
+                continue
+            task = self.pending.pop(key)
+            task.cancelled = True
+            self.pool.tryTake(task)
+
+    def cancel_all(self):
+        self.cancel_except(set())
+
+    def pending_count(self):
+        return len(self.pending)
+
+    def on_task_done(self, task, image):
+        if self.pending.get(task.key()) is not task:
+            return  # 已被取消或被新的同名任务替换
+        del self.pending[task.key()]
+        if not task.cancelled:
+            self.loaded.emit(task.path, task.target_width, task.result_quality, image)
@@ -1,233 +1,1067 @@
 import sys
 import os
 import json
+import time
+import argparse
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, 
-                             QLabel, QStackedLayout, QMainWindow, QHBoxLayout)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QCursor, QTouchEvent, QPixmap
-from slide import SlideAnimator
+                             QLabel, QStackedLayout, QMainWindow, QGridLayout,
+                             QWIDGETSIZE_MAX)
+from PyQt5.QtCore import (Qt, QPropertyAnimation, QEasingCurve, QTimer, QSize, QEvent,
+                          QThreadPool, pyqtSignal)
+from PyQt5.QtGui import QCursor, QPixmap
+from slide import create_animator
+from animated import MoviePlayer
+from loader import ImageLoader, EmitGuard, PREVIEW, FAST, SMOOTH
+from album_index import AlbumIndex, IndexTask
+from cache import shared_cache, image_cache_key
+from disk_cache import DiskCache
+from shared_store import SharedImageStore
+from metrics import metrics, MetricsHud
+from watcher import AlbumWatcher
+from attract import AttractScheduler
+from health import Watchdog, Quarantine
+from governor import QualityGovernor
+
+
+# 滑动距离阈值（像素）
+SWIPE_THRESHOLD = 50
+# 拖动超过该距离（像素）后页面才开始跟随，避免点击时抖动
+DRAG_SLOP = 8
+# 轻扫速度阈值（像素/毫秒），超过时即使距离不足也翻页
+FLICK_VELOCITY = 0.5
+# 翻页动画时长（毫秒）
+SLIDE_DURATION = 300
+MIN_SLIDE_DURATION = 80
+# 当前页的解码优先级，高于所有预取页面
+CURRENT_PAGE_PRIORITY = 100
+# 预览的优先级加成，所有页面的预览都先于平滑缩放
+PREVIEW_PRIORITY = 2 * CURRENT_PAGE_PRIORITY
+# 启动计时起点，用于统计每个区域从启动到显示第一张图片的耗时
+STARTED_AT = time.perf_counter()
+# 没有 panes 配置时使用的旧版三栏相册键名
+LEGACY_ALBUM_KEYS = ['album_left', 'album_middle', 'album_right']
+
+
+def pane_configs(config):
+    """区域配置列表：优先使用 panes，没有时兼容旧的 album_left/album_middle/album_right"""
+    panes = config.get('panes')
+    if panes:
+        return panes
+    panes = []
+    for key in LEGACY_ALBUM_KEYS:
+        album_config = dict(config.get(key, {}))
+        album_config.setdefault('name', key)
+        panes.append(album_config)
+    return panes
+
+
+def grid_columns(config, count):
+    """区域排列的列数
+
+    layout.arrangement 为 "row"（默认，横向一排）、"column"（纵向一列）
+    或 "grid"（按 layout.columns 列从左到右、从上到下排列）。
+    """
+    layout_config = config.get('layout', {})
+    arrangement = layout_config.get('arrangement', 'row')
+    if arrangement == 'column':
+        return 1
+    if arrangement == 'grid':
+        return max(1, int(layout_config.get('columns', count)))
+    return max(1, count)
+
+
+def pane_position(config, position, count):
+    """第 position 个区域在网格中的 (行, 列)"""
+    return divmod(position, grid_columns(config, count))
 
 
 class VerticalPager(QWidget):
-    def __init__(self, image_folder=None):
+    # 后台索引完成，参数为图片路径列表
+    album_loaded = pyqtSignal(list)
+    # 相册变化后重新索引完成（在线程池中进行），参数同 album_loaded
+    album_reindexed = pyqtSignal(list)
+    # 第一张图片显示出来，参数为距启动的毫秒数
+    first_frame_shown = pyqtSignal(float)
+    # 开始/结束翻页（包括拖动），其他区域据此暂停/恢复动图
+    busy_changed = pyqtSignal(bool)
+    # 图片无法解码，参数为图片路径，由看门狗隔离
+    decode_failed = pyqtSignal(str)
+    # 翻页动画前进一帧，质量调节器据此统计帧间隔
+    animation_frame = pyqtSignal()
+
+    def __init__(self, image_folder=None, prefetch_depth=1, disk_cache=None,
+                 animation_engine="widget", name="", recursive=False, manifest_dir=None,
+                 shared_store=None, frame_cache_mb=16, slide_duration=SLIDE_DURATION,
+                 swipe_threshold=SWIPE_THRESHOLD, scaling=None, progressive=True,
+                 quarantine=None, hot_pages=3):
         super().__init__()
+        self.name = name  # 区域名称，用于性能日志
+        self.recursive = recursive  # 是否包含子文件夹中的图片
+        self.manifest_dir = manifest_dir  # 相册清单的保存目录，为空时不保存
+        self.quarantine = quarantine  # 无法解码的文件清单，索引时跳过
+        self.album_index = None
         self.layout = QStackedLayout(self)
         self.current_index = 0
         self.is_animating = False
-        self.animator = SlideAnimator(self)
+        # 正在进行的动画应结束的时间（time.monotonic）和收尾函数，看门狗据此处理卡住的动画
+        self.animation_deadline = None
+        self.pending_finish = None
+        self.dragging = False
+        self.swipe_threshold = swipe_threshold
+        self.slide_duration = slide_duration
+        # 缩放质量："fast" 或 "smooth"，翻页过程中和停稳后分别设置；
+        # 翻页中快速缩放的页面在停稳后重新按平滑缩放加载
+        self.scaling = {'animating': 'smooth', 'settled': 'smooth'}
+        self.scaling.update(scaling or {})
+        # 两步显示：未缓存的页面先显示低分辨率预览，再换成平滑缩放的版本
+        self.progressive = progressive
+        # 翻页动画引擎："widget" 移动真实页面，"strip" 绘制预渲染的长图
+        self.animator = create_animator(self, animation_engine)
         self.image_paths = []  # 存储图片路径
+        self.demo_colors = []  # 没有图片时使用的示例页面颜色
+        # 预取深度：在前一页/后一页之外，当前页两侧各额外保留的页面数
+        self.prefetch_depth = max(0, int(prefetch_depth))
+        # 热窗口：当前页前后 hot_pages 页以内的图片以 QPixmap 留在共享缓存中，其余降级到温层
+        self.hot_pages = max(0, int(hot_pages))
+        self.live_pages = {}  # 页码 -> 已实例化的页面，只覆盖当前页附近的窗口
+        self.free_pages = []  # 已回收、等待复用的页面
+        # 最近一次滑动方向：1 为下一页，-1 为上一页，预取优先沿该方向进行
+        self.swipe_direction = 1
+        # 后台解码，GUI 线程只在交付时把 QImage 转成 QPixmap
+        self.loader = ImageLoader(self, disk_cache=disk_cache, shared_store=shared_store,
+                                  warm_store=shared_cache.warm)
+        self.loader.loaded.connect(self.on_image_loaded)
+        # 索引等后台任务完成时本分页器可能已被销毁（窗口关闭）
+        self.guard = EmitGuard(self)
+        # 当前图片缩放使用的像素宽度，第一次 resizeEvent 之前为 None（不提交解码）
+        self.scaled_width = None
+        # 当前页为动图时的播放器；只在当前页停稳后播放
+        self.movie = None
+        self.movie_holds = set()  # 暂停动图的原因："slide" 本区域翻页，"others" 其他区域翻页
+        self.frame_cache_bytes = int(frame_cache_mb * 1024 * 1024)
+        # 合并连续的尺寸变化（全屏切换、热插拔显示器），停止变化后再统一重新缩放
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(150)
+        self.resize_timer.timeout.connect(self.apply_target_size)
+        # 启动时先只解码当前页，第一帧显示后其余页面再陆续加载
+        self.first_frame_ms = None
+        self.indexing = False
+        self.placeholder = None
+        # 相册变化后的后台重新索引；进行中又有变化时，完成后再索引一次
+        self.reindex_task = None
+        self.reindex_pending = False
+        self.changed_paths = set()  # 等待应用的已删除或已修改的图片
+        self.album_reindexed.connect(self.on_album_reindexed)
 
         # 如果提供了图片文件夹路径，则加载图片
         if image_folder and os.path.exists(image_folder):
             self.load_images_from_folder(image_folder)
         else:
             # 创建几个示例页面
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-            for i, color in enumerate(colors):
-                page = QWidget()
-                page.setStyleSheet(f"background-color: {color}; border-radius: 10px;")
-                layout = QVBoxLayout()
-                label = QLabel(f"Page {i+1}")
-                label.setAlignment(Qt.AlignCenter)
-                label.setStyleSheet("font-size: 24px; color: white; font-weight: bold;")
-                layout.addWidget(label)
-                page.setLayout(layout)
-                self.layout.addWidget(page)
-        
+            self.demo_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+
+        self.refresh_window()
         self.setMinimumSize(400, 600)
     
     def load_images_from_folder(self, folder_path):
-        """从指定文件夹加载图片"""
-        # 支持的图片格式
-        supported_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
-        
-        # 获取文件夹中的所有图片文件
-        for filename in os.listdir(folder_path):
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in supported_formats:
-                self.image_paths.append(os.path.join(folder_path, filename))
+        """在后台线程中索引文件夹（自然排序），索引完成前显示占位页面"""
+        self.album_index = AlbumIndex(folder_path, self.recursive, self.manifest_dir, self.quarantine)
+        self.show_placeholder("加载中…")
+        self.indexing = True
+        self.album_loaded.connect(self.on_album_loaded)
+        self.index_task = IndexTask(self.album_index, self.guard, 'album_loaded')
+        # 索引只读取文件头，优先于所有解码任务
+        QThreadPool.globalInstance().start(self.index_task, CURRENT_PAGE_PRIORITY + 1)
+
+    def on_album_loaded(self, paths):
+        """索引完成：移除占位页面并开始加载当前页"""
+        self.indexing = False
+        self.index_task = None
+        self.image_paths = paths
+        self.update_placeholder(paths)
+        self.refresh_window()
+
+    def show_placeholder(self, text):
+        """显示占位页面（加载中或没有图片）"""
+        if self.placeholder is None:
+            self.placeholder = QLabel()
+            self.placeholder.setAlignment(Qt.AlignCenter)
+            self.placeholder.setStyleSheet("font-size: 24px; color: #888888;")
+            self.layout.addWidget(self.placeholder)
+        self.placeholder.setText(text)
+        self.layout.setCurrentWidget(self.placeholder)
+
+    def update_placeholder(self, paths):
+        """索引完成：有图片时移除占位页面，没有图片时显示提示"""
+        if not paths:
+            self.show_placeholder("没有图片")
+        elif self.placeholder is not None:
+            self.layout.removeWidget(self.placeholder)
+            self.placeholder.deleteLater()
+            self.placeholder = None
+
+    def apply_album_diff(self, added, removed, modified):
+        """相册有变化：在线程池中重新索引，完成后增量更新图片列表"""
+        if self.album_index is None or self.indexing:
+            return
+        changed = set(removed) | set(modified)
+        for path in changed:
+            shared_cache.discard_path(path)
+        self.changed_paths |= changed
+        if self.reindex_task is not None:
+            self.reindex_pending = True
+            return
+        self.start_reindex()
+
+    def start_reindex(self):
+        # 未变化的文件只做 stat，新文件和修改过的文件探测文件头，顺序保持自然排序
+        self.reindex_pending = False
+        self.reindex_task = IndexTask(self.album_index, self.guard, 'album_reindexed')
+        QThreadPool.globalInstance().start(self.reindex_task, CURRENT_PAGE_PRIORITY + 1)
+
+    def on_album_reindexed(self, paths):
+        """重新索引完成：尽量保持当前页不变，只重新解码有变化的图片"""
+        if self.reindex_pending:
+            # 索引期间又有变化，结果已经过时
+            self.start_reindex()
+            return
+        if self.is_animating or self.dragging:
+            # 翻页过程中不改动页面，稍后再应用
+            QTimer.singleShot(300, lambda: self.on_album_reindexed(paths))
+            return
+        self.reindex_task = None
+        changed, self.changed_paths = self.changed_paths, set()
+        old_paths = self.image_paths
+        current_path = old_paths[self.current_index] if old_paths else None
+        self.image_paths = paths
+        self.update_placeholder(paths)
+        new_index = {path: index for index, path in enumerate(self.image_paths)}
+
+        if current_path in new_index:
+            self.current_index = new_index[current_path]
+        else:
+            self.current_index = min(self.current_index, max(len(self.image_paths) - 1, 0))
+
+        # 未变化的页面按新页码保留，其余回收后由 refresh_window 重新绑定
+        live_pages = {}
+        for index, page in self.live_pages.items():
+            path = old_paths[index] if index < len(old_paths) else None
+            if path in new_index and path not in changed:
+                page.page_index = new_index[path]
+                live_pages[page.page_index] = page
+            else:
+                self.release_page(page)
+        self.live_pages = live_pages
+        self.refresh_window()
+
+    def page_count(self):
+        """总页数（图片数或示例页面数）"""
+        return len(self.image_paths) or len(self.demo_colors)
+
+    def window_indices(self):
+        """当前页附近需要保持实例化的页码，按与当前页的距离排序"""
+        count = self.page_count()
+        if count == 0:
+            return []
+        radius = 1 + self.prefetch_depth
+        indices = [self.current_index]
+        for offset in range(1, radius + 1):
+            # 先放滑动方向前方的页面，解码时优先级更高
+            for step in (self.swipe_direction, -self.swipe_direction):
+                index = (self.current_index + step * offset) % count
+                if index not in indices:
+                    indices.append(index)
+        return indices
+
+    def refresh_window(self):
+        """围绕当前页回收/复用页面，使实例化的页面数只取决于窗口大小"""
+        wanted = self.window_indices()
+        for index in list(self.live_pages):
+            if index not in wanted:
+                self.release_page(self.live_pages.pop(index))
+        for index in wanted:
+            if index not in self.live_pages:
+                self.live_pages[index] = self.acquire_page(index)
+
+        # 跳页时可能临时多建了页面，超出窗口容量的空闲页面直接销毁
+        while self.free_pages and len(self.live_pages) + len(self.free_pages) > len(wanted):
+            page = self.free_pages.pop()
+            self.layout.removeWidget(page)
+            page.deleteLater()
+
+        current = self.live_pages.get(self.current_index)
+        if current is not None and not self.is_animating:
+            self.layout.setCurrentWidget(current)
+        self.request_images(wanted)
+        self.update_hot_window()
+
+    def update_hot_window(self):
+        """声明本区域的热窗口（至少覆盖实例化的页面），窗口外的图片由共享缓存降级到温层"""
+        if not self.image_paths or self.scaled_width is None:
+            return
+        count = len(self.image_paths)
+        radius = max(self.hot_pages, 1 + self.prefetch_depth)
+        indices = {(self.current_index + offset) % count for offset in range(-radius, radius + 1)}
+        shared_cache.set_hot(self.name, [self.cache_key(self.image_paths[index], self.scaled_width)
+                                         for index in indices])
+
+    def target_width(self):
+        """图片缩放的目标像素宽度（已按 devicePixelRatio 换算）"""
+        return self.scaled_width
+
+    def pixel_width(self):
+        """当前窗口宽度对应的像素宽度：使用窗口宽度（如果可用）或默认宽度"""
+        width = self.width() if self.width() > 0 else 400
+        return int(round(width * self.devicePixelRatioF()))
+
+    def apply_target_size(self):
+        """尺寸稳定后，按新宽度从原图（或磁盘缓存）重新缩放窗口内的页面"""
+        width = self.pixel_width()
+        if width == self.scaled_width:
+            return
+        self.scaled_width = width
+        self.request_images(self.window_indices())
+
+    def request_images(self, indices):
+        """按窗口顺序提交后台解码，并取消已离开窗口的过期任务"""
+        if not self.image_paths or self.scaled_width is None:
+            return
+        if self.first_frame_ms is None:
+            # 第一帧之前只解码当前页，三个区域的首张图片并行占满线程池
+            indices = indices[:1]
+        keep = set()
+        for rank, index in enumerate(indices):
+            keep.add(self.image_key(index))
+            page = self.live_pages.get(index)
+            if page is not None:
+                # 越靠前（当前页、滑动方向前方）的页面优先级越高
+                priority = CURRENT_PAGE_PRIORITY if rank == 0 else len(indices) - rank
+                self.request_page(page, priority)
+        self.loader.cancel_except(keep)
+
+    def page_ready(self, index):
+        """页面已显示目标尺寸、目标质量的图片（没有图片时示例页面总是就绪）"""
+        if not self.image_paths:
+            return not self.indexing
+        page = self.live_pages.get(index)
+        return (page is not None and self.scaled_width is not None
+                and page.image_key == self.image_key(index) and page.image_quality >= self.quality())
+
+    def cache_key(self, path, width):
+        """共享缓存的键：修改时间取自相册清单，GUI 线程中不访问（可能在网络共享上的）文件"""
+        info = self.album_index.info(path) if self.album_index is not None else None
+        return image_cache_key(path, width, info.get('mtime_ns') if info else None)
+
+    def image_key(self, index):
+        """页面应显示的 (图片路径, 缩放宽度)"""
+        return (self.image_paths[index], self.target_width())
+
+    def quality(self):
+        """当前应使用的解码质量：翻页过程中和停稳后可以分别配置"""
+        busy = self.is_animating or self.dragging
+        mode = self.scaling['animating'] if busy else self.scaling['settled']
+        return FAST if mode == 'fast' else SMOOTH
+
+    def request_page(self, page, priority=0):
+        """页面显示的图片与期望不一致时提交后台解码"""
+        if not self.image_paths or page.page_index is None or self.scaled_width is None:
+            return
+        key = self.image_key(page.page_index)
+        quality = self.quality()
+        if page.image_key == key and page.image_quality >= quality:
+            return
+        # 先查共享缓存，其他分页器或之前解码过的图片不再重复解码
+        pixmap = shared_cache.get(self.cache_key(*key))
+        if pixmap is not None:
+            self.set_page_pixmap(page, pixmap, key)
+            return
+        if self.progressive and page.image_key != key:
+            # 页面还没有任何版本：先显示低分辨率预览，平滑缩放完成后再替换
+            self.loader.request(key[0], key[1], priority + PREVIEW_PRIORITY, PREVIEW)
+            if quality == FAST:
+                return  # 翻页过程中预览已经足够，停稳后再平滑缩放
+        self.loader.request(key[0], key[1], priority, quality)
+
+    def on_image_loaded(self, path, width, quality, image):
+        """后台解码完成：交给仍然绑定该图片的页面，只用更高质量的版本替换已显示的版本"""
+        if width != self.target_width():
+            return
+        if image.isNull() and quality == PREVIEW:
+            return  # 预览失败时等待正式版本
+        pixmap = None
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
+            # 按像素宽度缩放，高 DPI 屏幕上保持清晰
+            pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+            if quality == SMOOTH:
+                shared_cache.put(self.cache_key(path, width), pixmap, self.name)
+        if pixmap is None:
+            # 正式版本解码失败，交给看门狗隔离
+            self.decode_failed.emit(path)
+        for page in self.live_pages.values():
+            if page.page_index is not None and self.image_paths[page.page_index] == path:
+                if page.image_key == (path, width) and page.image_quality >= quality:
+                    continue
+                if pixmap is None:
+                    page.image_key = (path, width)
+                    page.image_quality = SMOOTH
+                else:
+                    self.set_page_pixmap(page, pixmap, (path, width), quality)
+
+    def set_page_pixmap(self, page, pixmap, key, quality=SMOOTH):
+        image_label = page.image_label
+        image_label.setPixmap(pixmap)
+        self.hold_pixmap(page, pixmap)
+        # 设置label的尺寸策略以适应内容（逻辑尺寸）
+        ratio = pixmap.devicePixelRatio()
+        size = QSize(int(round(pixmap.width() / ratio)), int(round(pixmap.height() / ratio)))
+        image_label.setMinimumSize(size)
+        image_label.setMaximumSize(size)
+        page.image_key = key
+        page.image_quality = quality
+        if self.is_animating:
+            # 动画进行中替换了图片（例如预览换成平滑缩放的版本），由动画引擎决定如何刷新
+            self.animator.page_updated(page)
+        if page.page_index == self.current_index:
+            if self.first_frame_ms is None:
+                self.on_first_frame()
+            self.update_movie()
+
+    def hold_pixmap(self, page, pixmap):
+        """记录页面显示的图片：共享存储映射的图片在页面显示期间不能解除映射"""
+        shared_store = self.loader.shared_store
+        if shared_store is not None:
+            if page.pixmap is not None:
+                shared_store.release(page.pixmap)
+            if pixmap is not None:
+                shared_store.acquire(pixmap)
+        page.pixmap = pixmap
+
+    def is_animated(self, path):
+        """图片是否为动图：优先使用相册清单中的信息"""
+        info = self.album_index.info(path) if self.album_index is not None else None
+        if info is not None:
+            return info.get('animated', False)
+        return os.path.splitext(path)[1].lower() == '.gif'
+
+    def update_movie(self):
+        """当前页是动图时播放，离开当前页后停止，翻页期间暂停"""
+        page = self.live_pages.get(self.current_index)
+        key = page.image_key if page is not None and self.image_paths else None
+        if self.movie is not None and (self.movie.key != key or self.movie.label is not page.image_label):
+            self.movie.stop()
+            self.movie = None
+        if (self.movie is None and key is not None and key[1] == self.target_width()
+                and self.is_animated(key[0])):
+            movie = MoviePlayer(page.image_label, key[0], key[1], self.devicePixelRatioF(),
+                                self.frame_cache_bytes, self)
+            if not movie.is_valid():
+                movie.stop()
+                return
+            self.movie = movie
+        if self.movie is not None:
+            if self.movie_holds:
+                self.movie.pause()
+            else:
+                self.movie.play()
+
+    def hold_movie(self, reason, held):
+        """设置/解除一个暂停动图的原因；本区域翻页状态变化时通知其他区域"""
+        was_busy = self.is_busy()
+        if held:
+            self.movie_holds.add(reason)
+        else:
+            self.movie_holds.discard(reason)
+        if self.is_busy() != was_busy:
+            self.busy_changed.emit(self.is_busy())
+        self.update_movie()
+
+    def is_busy(self):
+        """本区域是否正在拖动或播放翻页动画"""
+        return 'slide' in self.movie_holds
+
+    def on_first_frame(self):
+        """当前页第一次显示图片：记录首帧耗时，然后加载窗口内的其余页面"""
+        self.first_frame_ms = (time.perf_counter() - STARTED_AT) * 1000
+        metrics.record('first_frame', self.first_frame_ms, self.name)
+        self.first_frame_shown.emit(self.first_frame_ms)
+        # 可能正处于 request_images 的循环中，下一轮事件循环再提交其余页面
+        QTimer.singleShot(0, lambda: self.request_images(self.window_indices()))
+
+    def page_widget(self, index):
+        """获取指定页码的页面，不在窗口内时临时实例化"""
+        page = self.live_pages.get(index)
+        if page is None:
+            page = self.acquire_page(index)
+            self.live_pages[index] = page
+            self.request_page(page, len(self.live_pages))
+        return page
+
+    def acquire_page(self, index):
+        """从空闲页面中取一个（没有则新建）并绑定到指定页码"""
+        if self.free_pages:
+            page = self.free_pages.pop()
+        else:
+            page = self.create_page()
+        self.bind_page(page, index)
+        return page
+
+    def release_page(self, page):
+        """回收页面：释放图片并放回空闲列表"""
+        if self.movie is not None and self.movie.label is page.image_label:
+            self.movie.stop()
+            self.movie = None
+        page.page_index = None
+        page.image_key = None
+        page.image_quality = PREVIEW
+        page.image_label.clear()
+        self.hold_pixmap(page, None)
+        page.hide()
+        self.free_pages.append(page)
+
+    def create_page(self):
+        """创建一个可复用的空页面"""
+        page = QWidget()
+        layout = QVBoxLayout()
+        # 设置布局无边距
+        layout.setContentsMargins(0, 0, 0, 0)
         
-        # 为每个图片创建页面
-        for image_path in self.image_paths:
-            page = QWidget()
-            layout = QVBoxLayout()
-            # 设置布局无边距
-            layout.setContentsMargins(0, 0, 0, 0)
-            
-            # 创建QLabel显示图片
-            image_label = QLabel()
-            image_label.setAlignment(Qt.AlignCenter)
-            
-            # 加载并显示图片，宽度与窗口宽度匹配
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                # 使用窗口宽度（如果可用）或默认宽度
-                target_width = self.width() if self.width() > 0 else 400
-                # 计算保持比例的高度并转换为整数
-                target_height = int(pixmap.height() * target_width / pixmap.width())
-                scaled_pixmap = pixmap.scaled(
-                    target_width,
-                    target_height,
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation
-                )
-                image_label.setPixmap(scaled_pixmap)
-                image_label.setMinimumSize(scaled_pixmap.size())
-                image_label.setMaximumSize(scaled_pixmap.size())
-                
-            layout.addWidget(image_label)
-            page.setLayout(layout)
-            self.layout.addWidget(page)
+        # 创建QLabel显示图片
+        image_label = QLabel()
+        image_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(image_label)
+        page.setLayout(layout)
+
+        page.image_label = image_label
+        page.page_index = None
+        page.image_key = None  # 当前显示的 (图片路径, 缩放宽度)
+        page.pixmap = None  # 当前显示的图片
+        page.image_quality = PREVIEW  # 显示的版本的质量（PREVIEW/FAST/SMOOTH）
+        self.layout.addWidget(page)
+        return page
+
+    def bind_page(self, page, index):
+        """把页面内容设置为指定页码的图片（或示例页面）"""
+        page.page_index = index
+        page.image_key = None
+        page.image_quality = PREVIEW
+        image_label = page.image_label
+        image_label.clear()
+        image_label.setMinimumSize(0, 0)
+        image_label.setMaximumSize(QWIDGETSIZE_MAX, QWIDGETSIZE_MAX)
+
+        if not self.image_paths:
+            color = self.demo_colors[index]
+            page.setStyleSheet(f"background-color: {color}; border-radius: 10px;")
+            image_label.setText(f"Page {index+1}")
+            image_label.setStyleSheet("font-size: 24px; color: white; font-weight: bold;")
+            return
+
+        page.setStyleSheet("")
+        image_label.setStyleSheet("")
+        # 图片由后台线程解码，完成后在 on_image_loaded 中显示
+        page.image_key = None
     
     def resizeEvent(self, event):
-        """窗口大小变化时重新调整图片大小，使图片宽度与窗口宽度匹配"""
-        for i in range(self.layout.count()):
-            page = self.layout.widget(i)
-            if page and page.layout() and page.layout().count() > 0:
-                image_label = page.layout().itemAt(0).widget()
-                if isinstance(image_label, QLabel) and hasattr(image_label, 'pixmap') and image_label.pixmap():
-                    # 获取窗口宽度
-                    window_width = self.width()
-                    # 调整图片大小，宽度与窗口宽度匹配，保持比例
-                    # 计算保持比例的高度并转换为整数
-                    target_height = int(image_label.pixmap().height() * window_width / image_label.pixmap().width())
-                    scaled_pixmap = image_label.pixmap().scaled(
-                        window_width, 
-                        target_height,
-                        Qt.KeepAspectRatio,
-                        Qt.SmoothTransformation
-                    )
-                    image_label.setPixmap(scaled_pixmap)
-                    # 设置label的尺寸策略以适应内容
-                    image_label.setMinimumSize(scaled_pixmap.size())
-                    image_label.setMaximumSize(scaled_pixmap.size())
+        """窗口大小变化时重新缩放图片，使图片宽度与窗口宽度匹配
+
+        总是从原图（或磁盘上的预缩放版本）重新缩放，不会在已缩放的图片上反复缩放；
+        只处理窗口内的页面，其余页面进入窗口时按新尺寸加载。
+        """
+        if self.scaled_width is None:
+            # 第一次获得尺寸时立即加载，之后的连续变化合并处理
+            self.apply_target_size()
+        else:
+            self.resize_timer.start()
         super().resizeEvent(event)
+
+    def showEvent(self, event):
+        # 窗口移动到 DPI 不同的屏幕时，逻辑尺寸可能不变，需要单独触发重新缩放
+        handle = self.window().windowHandle()
+        if handle is not None and not getattr(self, 'screen_hooked', False):
+            handle.screenChanged.connect(lambda screen: self.resize_timer.start())
+            self.screen_hooked = True
+        super().showEvent(event)
         
     def mousePressEvent(self, event):
-        self.start_pos = event.pos()
+        self.begin_drag(event.pos().y())
         super().mousePressEvent(event)
-        
+
+    def mouseMoveEvent(self, event):
+        self.update_drag(event.pos().y())
+        super().mouseMoveEvent(event)
+
     def mouseReleaseEvent(self, event):
-        if self.is_animating:
-            return
-            
-        end_pos = event.pos()
-        delta_y = end_pos.y() - self.start_pos.y()
-        
-        # 滑动距离阈值
-        # 滑动距离阈值
-        if abs(delta_y) > 50:
-            if delta_y > 0:  # 向下滑动
-                new_index = (self.current_index - 1) % self.layout.count()
-                self.switch_to_page(new_index)
-
-            elif delta_y < 0:  # 向上滑动，下一页
-                new_index = (self.current_index + 1) % self.layout.count()
-                self.switch_to_page(new_index)
-        
+        self.end_drag(event.pos().y())
         super().mouseReleaseEvent(event)
-    
-    def touchEvent(self, event):
-        """处理触摸事件以支持触屏滑动"""
+
+    # 触摸事件由 MainWindow 统一接收，按触摸点分发到各分页器的 begin_drag/update_drag/end_drag
+
+    def begin_drag(self, y):
+        """手指/鼠标按下：打断正在进行的动画，然后从当前页开始跟随拖动"""
         if self.is_animating:
+            # 新的滑动不再被忽略：正在进行的动画立即跳到终点
+            self.animator.finish_now()
+        self.dragging = not self.is_animating
+        self.drag_start_y = y
+        self.drag_samples = [(time.monotonic(), y)]
+        self.drag_target = None  # 拖动时露出的相邻页码
+        self.drag_direction = None
+
+    def update_drag(self, y):
+        """拖动过程中让页面跟随手指移动"""
+        if not self.dragging:
             return
-        
-        # 获取触摸点
-        touch_points = event.touchPoints()
-        if not touch_points:
+        now = time.monotonic()
+        self.drag_samples.append((now, y))
+        # 只保留最近 100ms 的采样，用于计算松手时的速度
+        while len(self.drag_samples) > 2 and now - self.drag_samples[0][0] > 0.1:
+            self.drag_samples.pop(0)
+
+        count = self.page_count()
+        delta_y = y - self.drag_start_y
+        if count < 2 or (self.drag_target is None and abs(delta_y) < DRAG_SLOP):
             return
-        
-        touch_point = touch_points[0]  # 只处理第一个触摸点
-        
-        if touch_point.state() == QTouchEvent.TouchPointPressed:
-            # 触摸开始，记录起始位置
-            self.start_pos = touch_point.pos().toPoint()
-        elif touch_point.state() == QTouchEvent.TouchPointReleased:
-            # 触摸结束，计算滑动距离
-            end_pos = touch_point.pos().toPoint()
-            delta_y = end_pos.y() - self.start_pos.y()
-            
-            # 滑动距离阈值
-            if abs(delta_y) > 50:
-                if delta_y > 0:  # 向下滑动
-                    new_index = (self.current_index - 1) % self.layout.count()
-                    self.switch_to_page(new_index)
-
-                elif delta_y < 0:  # 向上滑动，下一页
-                    new_index = (self.current_index + 1) % self.layout.count()
-                    self.switch_to_page(new_index)
-        
-        # 接受事件
-        event.accept()
-    
+
+        # 向上拖动露出下一页，向下拖动露出上一页
+        direction = "up" if delta_y < 0 else "down"
+        step = 1 if direction == "up" else -1
+        target = (self.current_index + step) % count
+        if self.drag_target is None:
+            # 开始露出相邻页面，动图暂停到翻页结束
+            self.hold_movie('slide', True)
+        elif self.drag_target != target:
+            # 拖动方向反转，收起原来露出的页面
+            self.page_widget(self.drag_target).hide()
+        self.drag_target = target
+        self.drag_direction = direction
+
+        progress = min(abs(delta_y) / max(self.height(), 1), 1.0)
+        self.animator.drag(self.page_widget(self.current_index),
+                           self.page_widget(target), direction, progress)
+
+    def drag_velocity(self):
+        """松手时的速度（像素/毫秒），负数表示向上"""
+        (t0, y0), (t1, y1) = self.drag_samples[0], self.drag_samples[-1]
+        if t1 - t0 < 0.001:
+            return 0.0
+        return (y1 - y0) / ((t1 - t0) * 1000)
+
+    def end_drag(self, y):
+        """松手：根据距离和速度决定翻页或回弹，动画时长由松手速度决定"""
+        if not self.dragging:
+            return
+        self.update_drag(y)
+        self.dragging = False
+        if self.drag_target is None:
+            return  # 点击或移动距离过小
+
+        delta_y = y - self.drag_start_y
+        velocity = self.drag_velocity()
+        h = max(self.height(), 1)
+        progress = min(abs(delta_y) / h, 1.0)
+
+        # 与拖动同向的快速轻扫，或拖动距离超过阈值且松手时没有往回甩，则翻页
+        same_way = velocity * delta_y > 0
+        fast = abs(velocity) > FLICK_VELOCITY
+        flung_back = fast and not same_way
+        if (same_way and fast) or (abs(delta_y) > self.swipe_threshold and not flung_back):
+            remaining = (1.0 - progress) * h
+            speed = max(abs(velocity) if same_way else 0.0, h / self.slide_duration)
+            duration = int(min(max(remaining / speed, MIN_SLIDE_DURATION), self.slide_duration))
+            self.start_slide(self.drag_target, self.drag_direction, duration, progress)
+        else:
+            self.snap_back(self.drag_target, self.drag_direction, progress)
+
+    def cancel_drag(self):
+        """触摸被系统取消时退回当前页"""
+        if not self.dragging:
+            return
+        self.dragging = False
+        if self.drag_target is not None:
+            progress = min(abs(self.drag_samples[-1][1] - self.drag_start_y) / max(self.height(), 1), 1.0)
+            self.snap_back(self.drag_target, self.drag_direction, progress)
+
+    def snap_back(self, target, direction, progress):
+        """滑动不足时动画退回当前页"""
+        old_widget = self.page_widget(self.current_index)
+        new_widget = self.page_widget(target)
+        self.is_animating = True
+        self.hold_movie('slide', True)
+        duration = int(max(progress * self.slide_duration, MIN_SLIDE_DURATION))
+        started = self.begin_measure()
+        anim = self.animator.snap_back(old_widget, new_widget, direction, progress, duration)
+        anim.valueChanged.connect(self.on_animation_frame)
+
+        def finish():
+            if self.pending_finish is not finish:
+                return  # 已由看门狗完成
+            self.pending_finish = None
+            new_widget.hide()
+            old_widget.move(0, 0)
+            self.is_animating = False
+            self.end_measure(started, 'snap_back')
+            self.hold_movie('slide', False)
+            # 翻页过程中快速缩放的页面换成平滑缩放的版本
+            self.request_images(self.window_indices())
+
+        self.expect_finish(finish, duration)
+        anim.finished.connect(finish)
+
     def switch_to_page(self, new_index):
         if self.is_animating:
-            return
+            # 正在进行的动画立即完成，新的翻页接着执行
+            self.animator.finish_now()
+            if self.is_animating:
+                return
 
-        count = self.layout.count()
-        old_widget = self.layout.currentWidget()
-        new_widget = self.layout.widget(new_index)
+        count = self.page_count()
+        if count < 2 or new_index == self.current_index:
+            return
 
         # 判断方向（处理循环）
         if (new_index == (self.current_index + 1) % count):
             direction = "up"
         else:
             direction = "down"
+        self.start_slide(new_index, direction, self.slide_duration)
 
+    def start_slide(self, new_index, direction, duration, progress=0.0):
+        """从 progress 处开始翻页动画，结束后以新页为中心刷新窗口"""
+        old_widget = self.page_widget(self.current_index)
+        new_widget = self.page_widget(new_index)
+        self.swipe_direction = 1 if direction == "up" else -1
         self.is_animating = True
+        self.hold_movie('slide', True)
 
         # 执行动画
-        anim = self.animator.slide(old_widget, new_widget, direction)
+        started = self.begin_measure()
+        anim = self.animator.slide(old_widget, new_widget, direction, duration, progress)
+        anim.valueChanged.connect(self.on_animation_frame)
 
         def finish():
-            self.layout.setCurrentIndex(new_index)
+            if self.pending_finish is not finish:
+                return  # 已由看门狗完成
+            self.pending_finish = None
             self.current_index = new_index
+            self.layout.setCurrentWidget(new_widget)
             old_widget.hide()
             self.is_animating = False
+            # 以新的当前页为中心回收/复用页面
+            self.refresh_window()
+            self.end_measure(started, 'slide')
+            self.hold_movie('slide', False)
 
+        self.expect_finish(finish, duration)
         anim.finished.connect(finish)
 
+    def expect_finish(self, finish, duration):
+        """记录动画的收尾函数和预定结束时间"""
+        self.pending_finish = finish
+        self.animation_deadline = time.monotonic() + duration / 1000
+
+    def force_settle(self):
+        """动画超时：先让动画引擎跳到终点，finished 仍未触发时直接执行收尾"""
+        self.animator.finish_now()
+        if self.is_animating and self.pending_finish is not None:
+            self.animator.stop()
+            self.pending_finish()
+        if self.is_animating:
+            # 没有收尾函数可用，只恢复到可操作的状态
+            self.is_animating = False
+            self.hold_movie('slide', False)
+            self.refresh_window()
+
+    def begin_measure(self):
+        """动画开始（松手或程序翻页）时记录时间点"""
+        metrics.input_released(self.name)
+        return time.perf_counter()
+
+    def end_measure(self, started, detail):
+        """记录从松手到页面停稳的耗时"""
+        metrics.record('swipe_settle', (time.perf_counter() - started) * 1000, self.name, detail)
+        metrics.animation_finished(self.name)
+
+    def on_animation_frame(self, value):
+        metrics.frame(self.name)
+        self.animation_frame.emit()
+
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, enable_metrics=False, show_hud=False, config_file='config.json'):
         super().__init__()
         self.setWindowTitle("三栏图片浏览器 - 上下滑动翻页")
         
         # 加载配置文件
+        self.config_file = config_file
         self.config = self.load_config()
+        # 性能埋点：配置文件或命令行任一开启即生效
+        self.setup_metrics(enable_metrics, show_hud)
         
-        # 创建主窗口部件和水平布局
+        # 创建主窗口部件和网格布局，区域的排列方式由配置决定
         central_widget = QWidget()
-        self.main_layout = QHBoxLayout(central_widget)
+        self.main_layout = QGridLayout(central_widget)
         self.main_layout.setSpacing(0)  # 区域之间没有间隔
         self.main_layout.setContentsMargins(0, 0, 0, 0)  # 无边距
         
-        # 根据配置创建三个垂直分页器
+        # 根据配置创建垂直分页器
         self.pagers = []
-        # 使用config.json中的键名
-        album_keys = ['album_left', 'album_middle', 'album_right']
-        for key in album_keys:
-            # 获取对应的相册配置
-            album_config = self.config.get(key, {})
+        panes = pane_configs(self.config)
+        # 所有区域的默认值，可以在每个区域的配置中单独覆盖
+        pager_config = self.config.get('pager', {})
+        # 翻页动画引擎，便于对比两种实现
+        animation_engine = self.config.get('animation', {}).get('engine', 'widget')
+        # 动图帧缓存上限（MB），超过时逐帧从文件解码
+        frame_cache_mb = self.config.get('animation', {}).get('gif_cache_mb', 16)
+        # 所有分页器共享的图片缓存预算（MB）
+        cache_config = self.config.get('cache', {})
+        budget_bytes = cache_config.get('memory_mb', 256) * 1024 * 1024
+        shared_cache.set_budget(budget_bytes)
+        # 磁盘上的预缩放缓存，重启后无需重新解码原图；disk_dir 为空时关闭
+        self.disk_cache = self.create_disk_cache(cache_config)
+        # 分层存储：当前页前后 hot_pages 页以内为 QPixmap（热层，受 memory_mb 限制），
+        # 更远的页面压缩保存（温层，受 warm_mb 限制），温层装不下时只留在磁盘缓存中（冷层）
+        shared_cache.warm.configure(cache_config.get('warm_mb', 0) * 1024 * 1024,
+                                    cache_config.get('warm_format', 'rgb888'))
+        shared_cache.cold = self.disk_cache
+        # 同一主机上多个实例共享的解码结果；shared_dir 为空时关闭
+        self.shared_store = self.create_shared_store(cache_config)
+        # 无法解码的文件清单，所有区域共用，重启后依然跳过
+        watchdog_config = self.config.get('watchdog', {})
+        self.quarantine = Quarantine(watchdog_config.get('quarantine_file', '.cache/quarantine.json') or None)
+        for position, album_config in enumerate(panes):
             image_folder = album_config.get('path', None)
-            
+            recursive = album_config.get('recursive', False)
+
+            def option(name, default):
+                return album_config.get(name, pager_config.get(name, default))
+
             # 创建分页器
-            pager = VerticalPager(image_folder)
+            pager = VerticalPager(image_folder,
+                                  # 预取深度：当前页前后额外保留的页面数，内存只随窗口大小增长
+                                  prefetch_depth=option('prefetch_depth', 1),
+                                  disk_cache=self.disk_cache,
+                                  shared_store=self.shared_store,
+                                  frame_cache_mb=frame_cache_mb,
+                                  animation_engine=animation_engine,
+                                  name=album_config.get('name', f"pane{position + 1}"),
+                                  recursive=recursive,
+                                  manifest_dir=cache_config.get('manifest_dir', '.cache/manifests'),
+                                  slide_duration=option('slide_duration', SLIDE_DURATION),
+                                  swipe_threshold=option('swipe_threshold', SWIPE_THRESHOLD),
+                                  scaling=option('scaling', None),
+                                  progressive=option('progressive', True),
+                                  quarantine=self.quarantine,
+                                  hot_pages=cache_config.get('hot_pages', 3))
             self.pagers.append(pager)
-            self.main_layout.addWidget(pager)
+            # 区域的缓存份额（占总预算的比例），未设置时与其他区域按 LRU 共用
+            cache_share = album_config.get('cache_share')
+            if cache_share is not None:
+                shared_cache.set_quota(pager.name, budget_bytes * cache_share)
+            # 索引完成后再开始监视文件夹，不占用启动时间
+            pager.album_loaded.connect(
+                lambda paths, pager=pager, folder=image_folder, recursive=recursive:
+                self.watch_album(pager, folder, recursive))
+            # 任一区域翻页时，其他区域的动图也暂停
+            pager.busy_changed.connect(self.on_pager_busy)
+            row, column = pane_position(self.config, position, len(panes))
+            self.main_layout.addWidget(pager, row, column)
         
         # 设置中央部件
         self.setCentralWidget(central_widget)
+
+        # 触摸事件在主窗口统一接收，按触摸点 ID 分发给所在区域的分页器，
+        # 多位观众可以同时滑动不同的区域
+        self.touch_routes = {}  # 触摸点 ID -> 分页器
+        # 待机轮播：无人触摸一段时间后各区域轮流自动翻页
+        self.attract = self.create_attract_scheduler()
+        # 看门狗：自动恢复卡住的动画和拖动，隔离无法解码的文件
+        self.watchdog = self.create_watchdog(watchdog_config)
+        # 翻页卡顿或解码积压时临时降低缩放质量、缩短动画、减少预取
+        self.governor = self.create_governor()
+        central_widget.setAttribute(Qt.WA_AcceptTouchEvents)
+        central_widget.installEventFilter(self)
+        if self.attract is not None:
+            # 鼠标点击直接发给分页器，同样视为有人操作
+            for pager in self.pagers:
+                pager.installEventFilter(self)
         
+        if self.hud is not None:
+            # HUD 创建早于中央部件，需要提到最上层
+            self.hud.move(10, 10)
+            self.hud.raise_()
+
         # 设置窗口大小
         self.resize(1200, 600)  # 三栏布局，每个分页器大约400x600
         # 设置全屏显示
         self.showFullScreen()
     
+    def watch_album(self, pager, image_folder, recursive=False):
+        """监视相册文件夹，图片增删改后增量更新分页器，无需重启"""
+        watch_config = self.config.get('watch', {})
+        if not watch_config.get('enabled', True) or not image_folder or not os.path.isdir(image_folder):
+            return
+        watcher = AlbumWatcher(image_folder,
+                               debounce_ms=watch_config.get('debounce_ms', 1000),
+                               poll_interval_ms=watch_config.get('poll_interval_ms', 10000),
+                               recursive=recursive, parent=pager)
+        watcher.changed.connect(pager.apply_album_diff)
+
+    def on_pager_busy(self, busy):
+        """有区域正在翻页时暂停其余区域的动图，全部停稳后恢复"""
+        for pager in self.pagers:
+            others = any(p is not pager and p.is_busy() for p in self.pagers)
+            pager.hold_movie('others', others)
+
+    def eventFilter(self, obj, event):
+        if self.attract is not None and event.type() in (QEvent.TouchBegin, QEvent.MouseButtonPress):
+            self.attract.user_activity()
+        if obj in self.pagers:
+            return False
+        if event.type() in (QEvent.TouchBegin, QEvent.TouchUpdate, QEvent.TouchEnd):
+            self.dispatch_touch(event)
+            return True
+        if event.type() == QEvent.TouchCancel:
+            for pager in self.touch_routes.values():
+                pager.cancel_drag()
+            self.touch_routes.clear()
+            return True
+        return super().eventFilter(obj, event)
+
+    def pager_at(self, screen_pos):
+        """屏幕坐标所在的分页器"""
+        for pager in self.pagers:
+            if pager.rect().contains(pager.mapFromGlobal(screen_pos)):
+                return pager
+        return None
+
+    def dispatch_touch(self, event):
+        """把每个触摸点交给按下时所在的分页器，每个分页器同时只跟随一根手指"""
+        for touch_point in event.touchPoints():
+            point_id = touch_point.id()
+            state = touch_point.state()
+            if state == Qt.TouchPointPressed:
+                pager = self.pager_at(touch_point.screenPos().toPoint())
+                # 同一区域已有手指在拖动时，忽略后按下的手指
+                if pager is None or pager in self.touch_routes.values():
+                    continue
+                self.touch_routes[point_id] = pager
+                pager.begin_drag(self.touch_y(pager, touch_point))
+                continue
+
+            pager = self.touch_routes.get(point_id)
+            if pager is None:
+                continue
+            if state == Qt.TouchPointMoved:
+                pager.update_drag(self.touch_y(pager, touch_point))
+            elif state == Qt.TouchPointReleased:
+                del self.touch_routes[point_id]
+                pager.end_drag(self.touch_y(pager, touch_point))
+
+    def touch_y(self, pager, touch_point):
+        """触摸点在分页器内的纵坐标"""
+        return pager.mapFromGlobal(touch_point.screenPos().toPoint()).y()
+
+    def setup_metrics(self, enable_metrics, show_hud):
+        """开启性能埋点：定期写入滚动 CSV/JSON 日志，可选显示实时 HUD"""
+        metrics_config = self.config.get('metrics', {})
+        enabled = enable_metrics or show_hud or metrics_config.get('enabled', False)
+        self.hud = None
+        if not enabled:
+            return
+        metrics.configure(True, metrics_config.get('log_dir', 'logs'),
+                          metrics_config.get('max_log_mb', 10))
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(metrics.flush)
+        self.metrics_timer.start(metrics_config.get('flush_interval_ms', 5000))
+        if show_hud or metrics_config.get('hud', False):
+            self.hud = MetricsHud(self)
+
+    def closeEvent(self, event):
+        # 丢弃排队中的解码，等待正在运行的任务结束后再销毁分页器
+        for pager in self.pagers:
+            pager.loader.cancel_all()
+        QThreadPool.globalInstance().waitForDone()
+        metrics.flush()
+        super().closeEvent(event)
+
+    def create_attract_scheduler(self):
+        """根据配置创建待机轮播调度器，未开启时返回 None"""
+        attract_config = self.config.get('attract', {})
+        if not attract_config.get('enabled', False):
+            return None
+        return AttractScheduler(self.pagers,
+                                idle_ms=int(attract_config.get('idle_s', 60) * 1000),
+                                interval_ms=int(attract_config.get('interval_s', 8) * 1000),
+                                parent=self)
+
+    def create_watchdog(self, watchdog_config):
+        """根据配置创建看门狗，未开启时返回 None"""
+        if not watchdog_config.get('enabled', True):
+            return None
+        watchdog = Watchdog(self.pagers, self.quarantine,
+                            interval_ms=watchdog_config.get('interval_ms', 500),
+                            grace_ms=watchdog_config.get('grace_ms', 1000),
+                            drag_timeout_ms=int(watchdog_config.get('drag_timeout_s', 10) * 1000),
+                            parent=self)
+        watchdog.drag_cancelled.connect(self.drop_touch_routes)
+        return watchdog
+
+    def create_governor(self):
+        """根据配置创建自适应质量调节器，未开启时返回 None"""
+        governor_config = self.config.get('governor', {})
+        if not governor_config.get('enabled', True):
+            return None
+        return QualityGovernor(self.pagers,
+                               target_fps=governor_config.get('target_fps', 60),
+                               interval_ms=governor_config.get('interval_ms', 500),
+                               degrade_ratio=governor_config.get('degrade_ratio', 1.5),
+                               restore_ratio=governor_config.get('restore_ratio', 1.15),
+                               queue_high=governor_config.get('queue_high', 6),
+                               queue_low=governor_config.get('queue_low', 1),
+                               restore_after_ms=int(governor_config.get('restore_after_s', 3) * 1000),
+                               duration_scale=governor_config.get('duration_scale', 0.6),
+                               parent=self)
+
+    def drop_touch_routes(self, pager):
+        """清除分到该分页器的触摸点，之后的新触摸可以重新开始拖动"""
+        for point_id in [i for i, p in self.touch_routes.items() if p is pager]:
+            del self.touch_routes[point_id]
+
+    def create_disk_cache(self, cache_config):
+        """根据配置创建磁盘缓存，目录不可用时返回 None"""
+        disk_dir = cache_config.get('disk_dir', '.cache/renditions')
+        if not disk_dir:
+            return None
+        try:
+            disk_cache = DiskCache(disk_dir, cache_config.get('disk_mb', 1024) * 1024 * 1024)
+        except OSError as e:
+            print(f"创建磁盘缓存目录出错: {e}")
+            return None
+        # 启动完成后再清理超出容量的旧文件
+        QTimer.singleShot(5000, disk_cache.prune)
+        return disk_cache
+
+    def create_shared_store(self, cache_config):
+        """根据配置创建跨进程共享存储，目录不可用时返回 None"""
+        shared_dir = cache_config.get('shared_dir', '')
+        if not shared_dir:
+            return None
+        try:
+            shared_store = SharedImageStore(shared_dir, cache_config.get('shared_mb', 512) * 1024 * 1024)
+        except OSError as e:
+            print(f"创建共享图片目录出错: {e}")
+            return None
+        QTimer.singleShot(5000, shared_store.prune)
+        # 热层条目持有映射的引用，淘汰后映射才能解除
+        shared_cache.shared = shared_store
+        return shared_store
+
     def load_config(self):
         """加载配置文件"""
-        config_file = 'config.json'
+        config_file = self.config_file
         
         # 空的默认配置字典
         user_config = {}
@@ -245,7 +1079,7 @@ class MainWindow(QMainWindow):
     
     def save_config(self, config):
         """保存配置到文件"""
-        config_file = 'config.json'
+        config_file = self.config_file
         try:
             with open(config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
@@ -258,8 +1092,14 @@ if __name__ == '__main__':
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(description="三栏图片浏览器")
+    parser.add_argument('--metrics', action='store_true', help="记录性能日志")
+    parser.add_argument('--hud', action='store_true', help="显示实时性能面板（同时记录日志）")
+    parser.add_argument('--config', default='config.json', help="配置文件路径")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(enable_metrics=args.metrics, show_hud=args.hud, config_file=args.config)
     # 窗口已经在初始化时设置为全屏，这里不需要再次调用show()
     # window.show()  # 注释掉普通显示方法
     sys.exit(app.exec_())
\ No newline at end of file
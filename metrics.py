@@ -0,0 +1,186 @@
+import os
+import csv
+import json
+import time
+import threading
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import QLabel
+
+from cache import shared_cache
+
+
+# 一帧的目标间隔（毫秒），超过 1.5 倍记为掉帧
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class Metrics:
+    """性能埋点：解码/缩放耗时、动画帧间隔、翻页延迟等
+
+    默认关闭，关闭时各记录方法直接返回。记录方法可以在工作线程中调用；
+    flush 在 GUI 线程中定期把明细写入滚动 CSV，并把汇总写入 JSON。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.log_dir = 'logs'
+        self.max_log_bytes = 10 * 1024 * 1024
+        self.lock = threading.Lock()
+        self.rows = []  # 尚未写入 CSV 的明细
+        self.summary = {}  # 类型 -> {count, total_ms, max_ms, last_ms}
+        self.counters = {}  # 类型 -> 次数
+        self.last_frame = {}  # 区域 -> 上一帧时间
+        self.pending_input = {}  # 区域 -> 松手时间，等待第一帧
+        self.health = {}  # 区域 -> 看门狗记录的健康状态
+        self.governor = {}  # 质量调节器的当前等级
+
+    def configure(self, enabled, log_dir='logs', max_log_mb=10):
+        self.enabled = enabled
+        self.log_dir = log_dir
+        self.max_log_bytes = int(max_log_mb * 1024 * 1024)
+        if enabled and log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+    def reset(self):
+        """清空已收集的数据"""
+        with self.lock:
+            self.rows = []
+            self.summary = {}
+            self.counters = {}
+        self.last_frame = {}
+        self.pending_input = {}
+
+    def record(self, kind, value_ms, pane='', detail=''):
+        """记录一次耗时（毫秒）"""
+        if not self.enabled:
+            return
+        with self.lock:
+            if self.log_dir:
+                self.rows.append((time.time(), kind, pane, round(value_ms, 3), detail))
+            stat = self.summary.setdefault(kind, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0})
+            stat['count'] += 1
+            stat['total_ms'] += value_ms
+            stat['max_ms'] = max(stat['max_ms'], value_ms)
+            stat['last_ms'] = value_ms
+
+    def count(self, kind, pane='', detail=''):
+        """记录一次事件（无耗时）"""
+        if not self.enabled:
+            return
+        with self.lock:
+            if self.log_dir:
+                self.rows.append((time.time(), kind, pane, '', detail))
+            self.counters[kind] = self.counters.get(kind, 0) + 1
+
+    def frame(self, pane):
+        """动画每前进一帧调用一次，记录帧间隔和松手到第一帧的延迟"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        released = self.pending_input.pop(pane, None)
+        if released is not None:
+            self.record('input_latency', (now - released) * 1000, pane)
+        last = self.last_frame.get(pane)
+        self.last_frame[pane] = now
+        if last is None:
+            return
+        interval = (now - last) * 1000
+        self.record('frame', interval, pane)
+        if interval > FRAME_BUDGET_MS * 1.5:
+            self.count('dropped_frame', pane, f"{interval:.1f}")
+
+    def input_released(self, pane):
+        """手指松开（或程序触发翻页）的时刻，用于计算到第一帧的延迟"""
+        if self.enabled:
+            self.pending_input[pane] = time.perf_counter()
+
+    def animation_finished(self, pane):
+        """动画结束后清除帧时钟，下一段动画的第一帧不计入间隔"""
+        self.last_frame.pop(pane, None)
+
+    def set_health(self, pane, state):
+        """更新区域的健康状态（看门狗的恢复次数等），写入 JSON 汇总"""
+        with self.lock:
+            self.health[pane] = dict(state)
+
+    def set_governor(self, state):
+        """更新质量调节器的当前等级和原因，写入 JSON 汇总"""
+        with self.lock:
+            self.governor = dict(state)
+
+    def snapshot(self):
+        """当前汇总，供 HUD 和 JSON 日志使用"""
+        with self.lock:
+            summary = {kind: dict(stat, avg_ms=stat['total_ms'] / stat['count'])
+                       for kind, stat in self.summary.items()}
+            counters = dict(self.counters)
+            health = {pane: dict(state) for pane, state in self.health.items()}
+            governor = dict(self.governor)
+        return {'timings': summary, 'counters': counters, 'cache': shared_cache.stats(),
+                'health': health, 'governor': governor}
+
+    def flush(self):
+        """把明细追加到滚动 CSV，并覆盖写入 JSON 汇总"""
+        if not self.enabled or not self.log_dir:
+            return
+        with self.lock:
+            rows, self.rows = self.rows, []
+        csv_path = os.path.join(self.log_dir, 'metrics.csv')
+        try:
+            # 超过上限时轮转为 metrics.csv.1
+            if os.path.exists(csv_path) and os.path.getsize(csv_path) > self.max_log_bytes:
+                os.replace(csv_path, csv_path + '.1')
+            new_file = not os.path.exists(csv_path)
+            with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(['timestamp', 'kind', 'pane', 'value_ms', 'detail'])
+                writer.writerows(rows)
+            summary_path = os.path.join(self.log_dir, 'metrics-summary.json')
+            with open(summary_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(dict(self.snapshot(), timestamp=time.time()), f, ensure_ascii=False, indent=2)
+            os.replace(summary_path + '.tmp', summary_path)
+        except OSError as e:
+            print(f"写入性能日志出错: {e}")
+
+
+class MetricsHud(QLabel):
+    """叠加在窗口左上角的实时性能面板"""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        # 不拦截触摸和鼠标
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: #7CFC00;"
+                           "font-family: monospace; font-size: 12px; padding: 6px;")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(500)
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        lines = []
+        for kind in ('frame', 'input_latency', 'swipe_settle', 'decode', 'scale',
+                     'warm_load', 'disk_load', 'shared_load'):
+            stat = snapshot['timings'].get(kind)
+            if stat:
+                lines.append(f"{kind:<14} avg {stat['avg_ms']:7.1f}  max {stat['max_ms']:7.1f}  n {stat['count']}")
+        for kind, value in sorted(snapshot['counters'].items()):
+            lines.append(f"{kind:<14} {value}")
+        cache = snapshot['cache']
+        lines.append(f"cache hit {cache['hit_rate']:.0%}  {cache['bytes'] / 1048576:.0f}/"
+                     f"{cache['budget_bytes'] / 1048576:.0f} MB  evict {cache['evictions']}")
+        tiers = cache['tiers']
+        lines.append(f"tiers hot {tiers['hot'] / 1048576:.0f}  warm {tiers['warm'] / 1048576:.0f}"
+                     f"  cold {tiers['cold'] / 1048576:.0f} MB")
+        governor = snapshot['governor']
+        if governor:
+            lines.append(f"quality {governor['mode']} ({governor['reason']})")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.raise_()
+
+
+# 全局埋点实例，由 MainWindow 根据配置或命令行开启
+metrics = Metrics()
@@ -0,0 +1,146 @@
+"""批量预渲染：按目标屏幕尺寸提前生成所有相册的显示尺寸版本
+
+用法：
+    python prerender.py --config config.json --screen 3840x2160 --dpr 1
+
+读取 config.json 中的相册，更新相册清单（查看器启动时直接使用），
+并在线程池中把每张图片解码、按 EXIF 方向旋转、缩放到区域宽度后写入磁盘缓存，
+文件名与查看器运行时完全一致。查看器只需按 1:1 读取预渲染的版本，不再解码原图。
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+
+from PyQt5.QtCore import QCoreApplication, QRunnable, QThreadPool
+
+from album_index import AlbumIndex
+from disk_cache import DiskCache
+from loader import decode_scaled
+from main import pane_configs, grid_columns
+
+
+class RenderTask(QRunnable):
+    """在线程池中渲染一张图片的所有目标宽度"""
+
+    def __init__(self, renderer, path, widths):
+        super().__init__()
+        # 由 Renderer 持有引用
+        self.setAutoDelete(False)
+        self.renderer = renderer
+        self.path = path
+        self.widths = widths
+
+    def run(self):
+        for width in self.widths:
+            image = decode_scaled(self.path, width)
+            ok = not image.isNull() and self.renderer.disk_cache.store(self.path, width, image)
+            self.renderer.done(self.path, width, ok)
+
+
+class Renderer:
+    """汇总渲染任务并输出进度"""
+
+    def __init__(self, disk_cache, total):
+        self.disk_cache = disk_cache
+        self.total = total
+        self.finished = 0
+        self.failed = []
+        self.lock = threading.Lock()
+
+    def done(self, path, width, ok):
+        with self.lock:
+            self.finished += 1
+            if not ok:
+                self.failed.append((path, width))
+            if self.finished % 20 == 0 or self.finished == self.total:
+                print(f"已渲染 {self.finished}/{self.total}")
+
+
+def target_widths(config, screen_width, dpr, pane_count):
+    """区域的像素宽度：全屏窗口按列数平分，不能整除时两种宽度都生成"""
+    columns = grid_columns(config, pane_count)
+    logical = screen_width / columns
+    return sorted({int(round(w * dpr)) for w in (math.floor(logical), math.ceil(logical))})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量预渲染相册的显示尺寸版本")
+    parser.add_argument('--config', default='config.json', help="配置文件路径")
+    parser.add_argument('--screen', default='1920x1080', help="屏幕逻辑分辨率，如 3840x2160")
+    parser.add_argument('--dpr', type=float, default=1.0, help="屏幕的 devicePixelRatio")
+    parser.add_argument('--width', type=int, action='append',
+                        help="直接指定目标像素宽度（可重复），指定后忽略 --screen")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="并行线程数")
+    parser.add_argument('--force', action='store_true', help="重新渲染已有的版本")
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv[:1])
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"读取配置文件出错: {e}")
+        return 1
+
+    cache_config = config.get('cache', {})
+    disk_dir = cache_config.get('disk_dir', '.cache/renditions')
+    if not disk_dir:
+        print("config.json 中 cache.disk_dir 为空，预渲染结果无处保存")
+        return 1
+    max_bytes = cache_config.get('disk_mb', 1024) * 1024 * 1024
+    disk_cache = DiskCache(disk_dir, max_bytes)
+
+    panes = pane_configs(config)
+    if args.width:
+        widths = sorted(set(args.width))
+    else:
+        screen_width = int(args.screen.lower().split('x')[0])
+        widths = target_widths(config, screen_width, args.dpr, len(panes))
+    print(f"目标宽度: {', '.join(str(w) for w in widths)} 像素")
+
+    # 相册清单：顺便剔除无法识别的文件，查看器启动时只需 stat
+    jobs = {}
+    for album_config in panes:
+        folder = album_config.get('path')
+        if not folder or not os.path.isdir(folder):
+            print(f"跳过不存在的相册: {folder}")
+            continue
+        album_index = AlbumIndex(folder, album_config.get('recursive', False),
+                                 cache_config.get('manifest_dir', '.cache/manifests'))
+        paths = album_index.load()
+        print(f"{album_config.get('name', folder)}: {len(paths)} 张图片")
+        for path in paths:
+            todo = [w for w in widths if args.force or not disk_cache.contains(path, w)]
+            if todo:
+                jobs.setdefault(path, todo)
+
+    total = sum(len(todo) for todo in jobs.values())
+    if total == 0:
+        print("所有图片都已有预渲染版本")
+        return 0
+    renderer = Renderer(disk_cache, total)
+    pool = QThreadPool.globalInstance()
+    pool.setMaxThreadCount(max(1, args.jobs))
+    started = time.perf_counter()
+    tasks = [RenderTask(renderer, path, todo) for path, todo in jobs.items()]
+    for task in tasks:
+        pool.start(task)
+    pool.waitForDone()
+    print(f"完成 {total - len(renderer.failed)}/{total}，耗时 {time.perf_counter() - started:.1f} 秒")
+    for path, width in renderer.failed:
+        print(f"渲染失败: {path} ({width})")
+
+    # 不在这里清理：最早写入的正是本次的预渲染结果
+    used = sum(entry.stat().st_size for entry in os.scandir(disk_dir) if entry.is_file())
+    if used > max_bytes * 0.9:
+        print(f"磁盘缓存已接近上限（{used / 1048576:.0f} MB），"
+              f"建议增大 cache.disk_mb，否则查看器会清理最早的预渲染版本")
+    return 1 if renderer.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
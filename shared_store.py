@@ -0,0 +1,170 @@
+import os
+import mmap
+import time
+import ctypes
+import struct
+import hashlib
+import threading
+
+from PyQt5 import sip
+from PyQt5.QtGui import QImage
+
+from disk_cache import prune_directory, remove_file
+
+
+# 文件头：魔数、宽、高、每行字节数、QImage 格式
+HEADER = struct.Struct('<4sIIII')
+MAGIC = b'PWS1'
+
+# 没有引用的映射至少保留的时间（秒）：工作线程刚读取、尚未交付到 GUI 线程的图片仍在使用
+UNMAP_GRACE_S = 30
+
+
+class SharedImageStore:
+    """多个进程共享的解码图片存储（显示尺寸的原始像素）
+
+    同一台主机上每块屏幕运行一个实例时，解码结果以原始像素文件的形式放在
+    共享目录（Linux 上建议 /dev/shm），其他进程直接内存映射并包装成 QImage，
+    不再复制像素，同一张图片在整台主机上只解码、只占用一份内存。
+    文件名与 DiskCache 相同，由 源文件路径 + 修改时间 + 文件大小 + 目标宽度 计算得出。
+    load/store 可以在工作线程中调用。
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # 已映射的文件：QImage 和由它转换的 QPixmap 都直接引用映射的内存，
+        # 因此按引用计数管理：热层缓存和页面持有引用（acquire/release），
+        # 没有引用并超过宽限时间后解除映射；文件被其他进程删除后映射依然有效
+        self.mappings = {}  # 文件路径 -> SharedMapping
+        self.addresses = {}  # 像素起始地址 -> 文件路径，用于识别映射的图片
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def entry_path(self, source_path, target_width):
+        """共享文件路径，源文件不存在时返回 None"""
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        ident = f"{os.path.abspath(source_path)}|{st.st_mtime_ns}|{st.st_size}|{target_width}"
+        return os.path.join(self.directory, hashlib.sha1(ident.encode('utf-8')).hexdigest() + '.raw')
+
+    def load(self, source_path, target_width):
+        """映射共享的像素文件并包装为 QImage（不复制），未命中时返回空 QImage"""
+        path = self.entry_path(source_path, target_width)
+        if path is None:
+            return QImage()
+        with self.lock:
+            mapping = self.mappings.get(path)
+            if mapping is None:
+                mapping = self.map_file(path)
+                if mapping is None:
+                    return QImage()
+                self.mappings[path] = mapping
+                self.addresses[mapping.address] = path
+            mapping.loaded_at = time.monotonic()
+        _, width, height, bytes_per_line, fmt = HEADER.unpack_from(mapping.mm, 0)
+        return QImage(sip.voidptr(mapping.address), width, height,
+                      bytes_per_line, QImage.Format(fmt))
+
+    def mapping_path(self, pixmap):
+        """QPixmap/QImage 直接引用的映射文件，不是映射的图片时返回 None"""
+        if pixmap.isNull():
+            return None
+        image = pixmap if isinstance(pixmap, QImage) else pixmap.toImage()
+        bits = image.constBits()
+        return None if bits is None else self.addresses.get(int(bits))
+
+    def owns(self, pixmap):
+        with self.lock:
+            return self.mapping_path(pixmap) is not None
+
+    def acquire(self, pixmap):
+        """缓存或页面开始持有一张图片；映射的图片增加引用计数（GUI 线程）"""
+        with self.lock:
+            path = self.mapping_path(pixmap)
+            if path is not None:
+                self.mappings[path].refs += 1
+
+    def release(self, pixmap):
+        """缓存或页面不再持有图片；引用计数归零的映射在宽限时间后解除（GUI 线程）"""
+        with self.lock:
+            path = self.mapping_path(pixmap)
+            if path is not None:
+                self.mappings[path].refs -= 1
+            self.unmap_idle()
+
+    def unmap_idle(self):
+        """解除没有引用并超过宽限时间的映射（调用方持有锁）"""
+        now = time.monotonic()
+        for path, mapping in list(self.mappings.items()):
+            if mapping.refs <= 0 and now - mapping.loaded_at > UNMAP_GRACE_S:
+                del self.mappings[path]
+                del self.addresses[mapping.address]
+                mapping.close()
+
+    def map_file(self, path):
+        """映射一个像素文件，文件不存在或不完整时返回 None"""
+        try:
+            with open(path, 'rb') as f:
+                # 写时复制映射：不修改时与其他进程共享同一份物理内存
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        if len(mm) < HEADER.size:
+            mm.close()
+            return None
+        magic, width, height, bytes_per_line, _ = HEADER.unpack_from(mm, 0)
+        size = bytes_per_line * height
+        if magic != MAGIC or width == 0 or height == 0 or len(mm) < HEADER.size + size:
+            mm.close()
+            return None
+        buffer = (ctypes.c_char * size).from_buffer(mm, HEADER.size)
+        return SharedMapping(mm, buffer)
+
+    def store(self, source_path, target_width, image):
+        """原子写入像素文件，返回映射后的 QImage；写入失败时返回原图"""
+        path = self.entry_path(source_path, target_width)
+        if path is None or image.isNull():
+            return image
+        # 转换为 QPixmap 的原生格式，交付时可以直接使用映射的内存
+        fmt = QImage.Format_ARGB32_Premultiplied if image.hasAlphaChannel() else QImage.Format_RGB32
+        if image.format() != fmt:
+            image = image.convertToFormat(fmt)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, image.width(), image.height(), image.bytesPerLine(), fmt))
+                f.write(image.constBits().asstring(image.sizeInBytes()))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"写入共享图片出错: {e}")
+            return image
+        finally:
+            remove_file(tmp_path)
+        shared = self.load(source_path, target_width)
+        return image if shared.isNull() else shared
+
+    def prune(self):
+        """共享目录超出容量时，删除最久未更新的文件（已映射的进程不受影响），
+        并解除本进程中不再使用的映射"""
+        prune_directory(self.directory, self.max_bytes)
+        with self.lock:
+            self.unmap_idle()
+
+
+class SharedMapping:
+    """一个已映射的像素文件及其引用计数"""
+
+    def __init__(self, mm, buffer):
+        self.mm = mm
+        self.buffer = buffer
+        self.address = ctypes.addressof(buffer)
+        self.refs = 0  # 持有该图片的缓存条目和页面数
+        self.loaded_at = time.monotonic()
+
+    def close(self):
+        # 先释放 ctypes 缓冲区，mmap 才能关闭
+        self.buffer = None
+        self.mm.close()
@@ -1,41 +1,67 @@
-from PyQt5.QtCore import QObject, QRect, QPoint, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import (QObject, QRect, QPoint, QPropertyAnimation, QEasingCurve,
+                          QVariantAnimation, QAbstractAnimation, Qt)
+from PyQt5.QtGui import QPainter, QPixmap
+from PyQt5.QtWidgets import QWidget
 
 class SlideAnimator(QObject):
     def __init__(self, container):
         super().__init__()
         self.container = container  # 要做动画的父 QWidget
+        self.anim_old = None
+        self.anim_new = None
 
-    def slide(self, old_widget, new_widget, direction="up", duration=300):
+    def positions(self, direction, progress):
+        """翻页进度为 progress（0~1）时旧页面和新页面的位置"""
+        h = self.container.height()
+        shift = int(round(progress * h))
+        if direction == "up":
+            return QPoint(0, -shift), QPoint(0, h - shift)
+        return QPoint(0, shift), QPoint(0, shift - h)
+
+    def drag(self, old_widget, new_widget, direction, progress):
+        """手指拖动时直接把两页摆到对应进度的位置"""
+        old_pos, new_pos = self.positions(direction, progress)
+        new_widget.setGeometry(0, new_pos.y(),
+                               self.container.width(), self.container.height())
+        new_widget.show()
+        old_widget.move(old_pos)
+
+    def slide(self, old_widget, new_widget, direction="up", duration=300, progress=0.0):
         """
         direction: "up"（下一页） 或 "down"（上一页）
+        progress: 从拖动到一半的位置继续时的起始进度
         """
-        h = self.container.height()
+        return self.animate(old_widget, new_widget, direction, progress, 1.0, duration)
 
-        if direction == "up":
-            start_pos_new = QPoint(0, h)
-            end_pos_old = QPoint(0, -h)
-        else:
-            start_pos_new = QPoint(0, -h)
-            end_pos_old = QPoint(0, h)
+    def snap_back(self, old_widget, new_widget, direction, progress, duration=200):
+        """滑动距离不足时退回原页面"""
+        return self.animate(old_widget, new_widget, direction, progress, 0.0, duration)
+
+    def animate(self, old_widget, new_widget, direction, start, end, duration):
+        start_pos_old, start_pos_new = self.positions(direction, start)
+        end_pos_old, end_pos_new = self.positions(direction, end)
 
         # 先把 new_widget 放到正确的初始位置
         new_widget.setGeometry(0, start_pos_new.y(),
-                               self.container.width(), h)
+                               self.container.width(), self.container.height())
         new_widget.show()
 
+        # 从头开始的翻页使用缓入缓出；松手后继续的动画保持手指速度逐渐减速
+        easing = QEasingCurve.InOutQuad if start == 0.0 else QEasingCurve.OutCubic
+
         # old_widget 动画
         anim_old = QPropertyAnimation(old_widget, b"pos")
         anim_old.setDuration(duration)
-        anim_old.setStartValue(old_widget.pos())
+        anim_old.setStartValue(start_pos_old)
         anim_old.setEndValue(end_pos_old)
-        anim_old.setEasingCurve(QEasingCurve.InOutQuad)
+        anim_old.setEasingCurve(easing)
 
         # new_widget 动画
         anim_new = QPropertyAnimation(new_widget, b"pos")
         anim_new.setDuration(duration)
         anim_new.setStartValue(start_pos_new)
-        anim_new.setEndValue(QPoint(0, 0))
-        anim_new.setEasingCurve(QEasingCurve.InOutQuad)
+        anim_new.setEndValue(end_pos_new)
+        anim_new.setEasingCurve(easing)
 
         # 启动动画
         anim_old.start()
@@ -46,3 +72,179 @@ class SlideAnimator(QObject):
         self.anim_new = anim_new
 
         return anim_new
+
+    def finish_now(self):
+        """立即把正在进行的动画跳到终点，触发 finished 信号"""
+        for anim in (self.anim_old, self.anim_new):
+            if anim is not None and anim.state() == QAbstractAnimation.Running:
+                anim.setCurrentTime(anim.duration())
+
+    def stop(self):
+        """停止动画并把页面放到终点位置，不触发 finished（动画卡住时由看门狗调用）"""
+        for anim in (self.anim_old, self.anim_new):
+            if anim is not None:
+                anim.stop()
+                target = anim.targetObject()
+                if target is not None:
+                    target.move(anim.endValue())
+
+    def page_updated(self, widget):
+        """动画中的页面换了图片：真实页面直接显示新内容，不需要处理"""
+
+
+class StripOverlay(QWidget):
+    """覆盖在分页器上方的绘制层，按偏移量绘制预先渲染好的长图"""
+
+    def __init__(self, container):
+        super().__init__(container)
+        self.strip = None
+        self.offset = 0
+        # 整个区域都由长图覆盖，不需要先擦除背景
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.hide()
+
+    def set_offset(self, offset):
+        self.offset = int(offset)
+        self.update()
+
+    def paintEvent(self, event):
+        if self.strip is None:
+            return
+        painter = QPainter(self)
+        painter.drawPixmap(0, -self.offset, self.strip)
+        painter.end()
+
+
+class StripSlideAnimator(QObject):
+    """合成式翻页动画：把新旧两页一次性渲染成一张上下拼接的长图，
+    动画期间只在一个覆盖层的 paintEvent 中按偏移绘制，
+    每帧开销与页面内容的复杂度无关，也不会触发子控件的布局和重绘。
+    """
+
+    def __init__(self, container):
+        super().__init__()
+        self.container = container  # 要做动画的父 QWidget
+        self.overlay = StripOverlay(container)
+        self.anim = None
+        self.prepared = None  # 当前长图对应的 (旧页面, 新页面, 方向)
+
+    def render_page(self, widget, w, h):
+        """把页面按最终尺寸渲染成 QPixmap"""
+        widget.setGeometry(0, 0, w, h)
+        if widget.layout() is not None:
+            widget.layout().activate()
+        return widget.grab()
+
+    def prepare(self, old_widget, new_widget, direction):
+        """渲染长图并显示覆盖层，同一组页面只渲染一次（拖动和后续动画共用）"""
+        key = (old_widget, new_widget, direction)
+        if self.prepared != key:
+            w = self.container.width()
+            h = self.container.height()
+
+            old_pixmap = self.render_page(old_widget, w, h)
+            new_pixmap = self.render_page(new_widget, w, h)
+            ratio = self.container.devicePixelRatioF()
+            strip = QPixmap(int(w * ratio), int(2 * h * ratio))
+            strip.setDevicePixelRatio(ratio)
+            strip.fill(Qt.black)
+
+            # "up" 时旧页在上、新页在下；"down" 反之
+            painter = QPainter(strip)
+            if direction == "up":
+                painter.drawPixmap(0, 0, old_pixmap)
+                painter.drawPixmap(0, h, new_pixmap)
+            else:
+                painter.drawPixmap(0, 0, new_pixmap)
+                painter.drawPixmap(0, h, old_pixmap)
+            painter.end()
+
+            self.overlay.strip = strip
+            self.prepared = key
+        self.overlay.setGeometry(0, 0, self.container.width(), self.container.height())
+        self.overlay.raise_()
+        self.overlay.show()
+
+    def offset_for(self, direction, progress):
+        """翻页进度对应的长图偏移：up 从 0 滑到 h，down 从 h 滑到 0"""
+        h = self.container.height()
+        if direction == "up":
+            return progress * h
+        return h - progress * h
+
+    def drag(self, old_widget, new_widget, direction, progress):
+        """手指拖动时按进度绘制长图"""
+        self.prepare(old_widget, new_widget, direction)
+        self.overlay.set_offset(self.offset_for(direction, progress))
+
+    def slide(self, old_widget, new_widget, direction="up", duration=300, progress=0.0):
+        """
+        direction: "up"（下一页） 或 "down"（上一页）
+        progress: 从拖动到一半的位置继续时的起始进度
+        """
+        return self.animate(old_widget, new_widget, direction, progress, 1.0, duration)
+
+    def snap_back(self, old_widget, new_widget, direction, progress, duration=200):
+        """滑动距离不足时退回原页面"""
+        return self.animate(old_widget, new_widget, direction, progress, 0.0, duration)
+
+    def animate(self, old_widget, new_widget, direction, start, end, duration):
+        self.prepare(old_widget, new_widget, direction)
+        start_offset = self.offset_for(direction, start)
+        self.overlay.set_offset(start_offset)
+
+        anim = QVariantAnimation(self)
+        anim.setDuration(duration)
+        anim.setStartValue(float(start_offset))
+        anim.setEndValue(float(self.offset_for(direction, end)))
+        # 从头开始的翻页使用缓入缓出；松手后继续的动画保持手指速度逐渐减速
+        anim.setEasingCurve(QEasingCurve.InOutQuad if start == 0.0 else QEasingCurve.OutCubic)
+        anim.valueChanged.connect(self.overlay.set_offset)
+        # 先于调用方的 finished 回调执行，切换到真实页面前移除覆盖层
+        anim.finished.connect(self.on_finished)
+        anim.start()
+
+        # 防止动画被回收
+        self.anim = anim
+        return anim
+
+    def on_finished(self):
+        self.overlay.hide()
+        self.overlay.strip = None
+        self.prepared = None
+
+    def finish_now(self):
+        """立即把正在进行的动画跳到终点，触发 finished 信号"""
+        if self.anim is not None and self.anim.state() == QAbstractAnimation.Running:
+            self.anim.setCurrentTime(self.anim.duration())
+
+    def stop(self):
+        """停止动画并移除覆盖层，不触发 finished（动画卡住时由看门狗调用）"""
+        if self.anim is not None:
+            self.anim.stop()
+        self.on_finished()
+
+    def page_updated(self, widget):
+        """动画中的页面换了图片：重新渲染长图，偏移和动画进度保持不变"""
+        if self.prepared is None or widget not in self.prepared[:2]:
+            return
+        key = self.prepared
+        self.prepared = None
+        self.prepare(*key)
+        self.overlay.update()
+
+
+# 可在 config.json 中选择的动画引擎
+ANIMATORS = {
+    'widget': SlideAnimator,
+    'strip': StripSlideAnimator,
+}
+
+
+def create_animator(container, engine="widget"):
+    """按名称创建翻页动画引擎，未知名称时使用默认的控件动画"""
+    animator_class = ANIMATORS.get(engine)
+    if animator_class is None:
+        print(f"未知的动画引擎: {engine}，使用 widget")
+        animator_class = SlideAnimator
+    return animator_class(container)
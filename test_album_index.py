@@ -0,0 +1,112 @@
+import os
+import json
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtGui import QColor, QImage
+from PyQt5.QtWidgets import QApplication
+
+import album_index
+from album_index import AlbumIndex, natural_key, scan_files
+from health import Quarantine
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def save_image(path, width=32, height=24):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor('#45B7D1'))
+    assert image.save(str(path))
+
+
+def test_natural_key_orders_numbers_by_value():
+    names = ["品牌墙图片 (10).jpg", "品牌墙图片 (9).jpg", "品牌墙图片 (1).jpg", "a.jpg", "B.jpg"]
+    assert sorted(names, key=natural_key) == [
+        "a.jpg", "B.jpg", "品牌墙图片 (1).jpg", "品牌墙图片 (9).jpg", "品牌墙图片 (10).jpg"]
+    assert natural_key("img (9)") < natural_key("img (10)")
+    assert natural_key("IMG 2.jpg") == natural_key("img 2.jpg")
+
+
+def test_scan_files_filters_and_sorts(app, tmp_path):
+    for name in ("img (10).png", "img (9).png", "img (1).png"):
+        save_image(tmp_path / name)
+    (tmp_path / "notes.txt").write_text("x")
+    (tmp_path / "sub").mkdir()
+    save_image(tmp_path / "sub" / "img (2).png")
+    (tmp_path / ".hidden").mkdir()
+    save_image(tmp_path / ".hidden" / "skip.png")
+
+    names = [os.path.relpath(p, tmp_path) for p in scan_files(str(tmp_path))]
+    assert names == ["img (1).png", "img (9).png", "img (10).png"]
+    names = [os.path.relpath(p, tmp_path) for p in scan_files(str(tmp_path), recursive=True)]
+    assert names == ["img (1).png", "img (9).png", "img (10).png", os.path.join("sub", "img (2).png")]
+
+
+def test_load_skips_invalid_and_writes_manifest(app, tmp_path):
+    album = tmp_path / "album"
+    album.mkdir()
+    save_image(album / "a (2).png", 64, 48)
+    save_image(album / "a (10).png")
+    (album / "broken.jpg").write_bytes(b"not an image")
+    manifest_dir = tmp_path / "manifests"
+
+    index = AlbumIndex(str(album), manifest_dir=str(manifest_dir))
+    paths = index.load()
+    assert [os.path.basename(p) for p in paths] == ["a (2).png", "a (10).png"]
+    assert index.info(paths[0])['width'] == 64
+    with open(index.manifest_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['version'] == album_index.MANIFEST_VERSION
+    assert data['entries']['broken.jpg']['valid'] is False
+
+
+def test_manifest_reused_for_unchanged_files(app, tmp_path, monkeypatch):
+    album = tmp_path / "album"
+    album.mkdir()
+    save_image(album / "1.png")
+    save_image(album / "2.png")
+    manifest_dir = str(tmp_path / "manifests")
+    AlbumIndex(str(album), manifest_dir=manifest_dir).load()
+
+    probed = []
+    real_probe = album_index.probe_image
+
+    def probe(path):
+        probed.append(os.path.basename(path))
+        return real_probe(path)
+
+    monkeypatch.setattr(album_index, 'probe_image', probe)
+    # 未变化的文件只做 stat，不再读取文件头
+    paths = AlbumIndex(str(album), manifest_dir=manifest_dir).load()
+    assert len(paths) == 2 and probed == []
+
+    # 修改过的文件和新文件重新探测
+    save_image(album / "2.png", 80, 60)
+    os.utime(album / "2.png", ns=(1, 1))
+    save_image(album / "3.png")
+    index = AlbumIndex(str(album), manifest_dir=manifest_dir)
+    paths = index.load()
+    assert sorted(probed) == ["2.png", "3.png"]
+    assert [os.path.basename(p) for p in paths] == ["1.png", "2.png", "3.png"]
+    assert index.info(paths[1])['width'] == 80
+
+
+def test_quarantined_files_skipped_until_changed(app, tmp_path):
+    album = tmp_path / "album"
+    album.mkdir()
+    save_image(album / "1.png")
+    save_image(album / "2.png")
+    quarantine = Quarantine(str(tmp_path / "quarantine.json"))
+    assert quarantine.add(str(album / "2.png"), 'decode')
+
+    index = AlbumIndex(str(album), quarantine=Quarantine(quarantine.path))
+    assert [os.path.basename(p) for p in index.load()] == ["1.png"]
+
+    # 文件被替换后自动解除隔离
+    save_image(album / "2.png", 64, 48)
+    os.utime(album / "2.png", ns=(2, 2))
+    assert [os.path.basename(p) for p in index.load()] == ["1.png", "2.png"]
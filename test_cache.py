@@ -0,0 +1,198 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtGui import QColor, QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from cache import CompactStore, PixmapCache, image_cache_key, pixmap_bytes, shared_cache
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def make_pixmap(width=40, height=30):
+    pixmap = QPixmap(width, height)
+    pixmap.fill(QColor('#4ECDC4'))
+    return pixmap
+
+
+def make_image(width=40, height=30):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor('#FF6B6B'))
+    return image
+
+
+def key(name, width=40):
+    return (name, 0, width)
+
+
+def test_lru_evicts_least_recently_used(app):
+    size = pixmap_bytes(make_pixmap())
+    cache = PixmapCache(budget_bytes=size * 2)
+    cache.put(key('a'), make_pixmap())
+    cache.put(key('b'), make_pixmap())
+    assert cache.get(key('a')) is not None  # a 变为最近使用
+    cache.put(key('c'), make_pixmap())
+    assert cache.get(key('b')) is None
+    assert cache.get(key('a')) is not None
+    assert cache.get(key('c')) is not None
+    assert cache.total_bytes == size * 2
+    assert cache.evictions == 1
+
+
+def test_quota_evicts_only_the_owner(app):
+    size = pixmap_bytes(make_pixmap())
+    cache = PixmapCache(budget_bytes=size * 10)
+    cache.set_quota('left', size)
+    cache.put(key('b1'), make_pixmap(), 'right')
+    cache.put(key('a1'), make_pixmap(), 'left')
+    cache.put(key('a2'), make_pixmap(), 'left')
+    assert key('a1') not in cache.entries
+    assert key('a2') in cache.entries
+    assert key('b1') in cache.entries
+    assert cache.owner_bytes == {'right': size, 'left': size}
+    assert cache.stats()['owner_bytes'] == {'right': size, 'left': size}
+
+
+def test_replacing_an_entry_keeps_byte_counts(app):
+    cache = PixmapCache()
+    cache.put(key('a'), make_pixmap(), 'left')
+    cache.put(key('a'), make_pixmap(80, 60), 'left')
+    size = pixmap_bytes(make_pixmap(80, 60))
+    assert cache.total_bytes == size
+    assert cache.owner_bytes['left'] == size
+
+
+def test_eviction_demotes_to_warm_tier(app):
+    size = pixmap_bytes(make_pixmap())
+    cache = PixmapCache(budget_bytes=size)
+    cache.warm.configure(1024 * 1024, 'rgb888')
+    cache.put(key('a'), make_pixmap())
+    cache.put(key('b'), make_pixmap())
+    QThreadPool.globalInstance().waitForDone()
+    assert key('a') not in cache.entries
+    warm = cache.warm.load(key('a'))
+    assert not warm.isNull() and warm.format() == QImage.Format_RGB888
+    tiers = cache.stats()['tiers']
+    assert tiers['hot'] == size
+    assert tiers['warm'] == warm.sizeInBytes()
+    assert tiers['cold'] == 0
+
+
+def test_discard_path_clears_both_tiers(app):
+    cache = PixmapCache()
+    cache.warm.configure(1024 * 1024)
+    path = os.path.normcase(os.path.abspath('a.jpg'))
+    cache.put((path, 0, 40), make_pixmap())
+    cache.warm.put((path, 0, 80), make_image())
+    cache.discard_path('a.jpg')
+    assert cache.entries == {}
+    assert cache.warm.entries == {}
+    assert cache.total_bytes == 0 and cache.warm.total_bytes == 0
+
+
+def test_compact_store_budget_and_formats(app):
+    store = CompactStore(0)
+    store.put(key('a'), make_image())
+    assert not store.enabled() and store.entries == {}
+
+    store.configure(make_image().width() * make_image().height() * 3 * 2, 'rgb888')
+    for name in ('a', 'b', 'c'):
+        store.put(key(name), make_image())
+    assert list(store.entries) == [key('b'), key('c')]
+    assert store.load(key('a')).isNull()
+    assert store.total_bytes == sum(image.sizeInBytes() for image in store.entries.values())
+
+    store.configure(1024 * 1024, 'jpeg')
+    store.put(key('d', 400), make_image(400, 300))
+    assert isinstance(store.entries[key('d', 400)], bytes)
+    assert store.load(key('d', 400)).size() == make_image(400, 300).size()
+    store.clear()
+    assert store.total_bytes == 0
+
+
+def test_page_turns_reuse_cache_after_wrap_around(app, tmp_path):
+    """循环翻页回到第一张时，预算以内的图片直接从缓存读取，不重新解码"""
+    from bench import wait_until, window_ready
+    from main import VerticalPager
+
+    for i in range(12):
+        make_image(320, 240).save(str(tmp_path / f"img ({i}).png"))
+    shared_cache.clear()
+    shared_cache.set_budget(256 * 1024 * 1024)
+    shared_cache.hits = shared_cache.misses = 0
+
+    # 热窗口覆盖整个相册：只受预算限制
+    pager = VerticalPager(str(tmp_path), name='wrap', hot_pages=12)
+    pager.resize(400, 600)
+    pager.show()
+    assert wait_until(app, lambda: window_ready(pager), 20000) is not None
+    for _ in range(30):
+        pager.switch_to_page((pager.current_index + 1) % pager.page_count())
+        assert wait_until(app, lambda: not pager.is_animating and window_ready(pager), 5000) is not None
+    stats = shared_cache.stats()
+    pager.close()
+    pager.deleteLater()
+    QThreadPool.globalInstance().waitForDone()
+    assert stats['hit_rate'] >= 0.5
+
+
+def test_pages_beyond_hot_window_move_to_warm_tier(app, tmp_path):
+    """离开热窗口的图片降级到温层，循环翻页回来时从温层读取，不重新解码原图"""
+    from bench import wait_until, window_ready
+    from main import VerticalPager
+    from metrics import metrics
+
+    for i in range(12):
+        make_image(320, 240).save(str(tmp_path / f"img ({i}).png"))
+    shared_cache.clear()
+    shared_cache.set_budget(256 * 1024 * 1024)
+    shared_cache.warm.configure(64 * 1024 * 1024, 'rgb888')
+    metrics.configure(True, log_dir=None)
+    metrics.reset()
+    try:
+        pager = VerticalPager(str(tmp_path), name='hot', hot_pages=1)
+        pager.resize(400, 600)
+        pager.show()
+        assert wait_until(app, lambda: window_ready(pager), 20000) is not None
+        for _ in range(30):
+            pager.switch_to_page((pager.current_index + 1) % pager.page_count())
+            assert wait_until(app, lambda: not pager.is_animating and window_ready(pager), 5000) is not None
+            QThreadPool.globalInstance().waitForDone()
+        # 热窗口半径至少覆盖实例化的页面（前后各 1 + prefetch_depth 页）
+        assert len(shared_cache.entries) <= 5
+        assert shared_cache.demotions > 0
+        assert len(shared_cache.warm.entries) >= 12 - 5
+        timings = metrics.snapshot()['timings']
+        assert timings['warm_load']['count'] > 0
+        # 每张图片最多解码一次预览和一次平滑版本
+        assert timings['decode']['count'] <= 24
+        pager.close()
+        pager.deleteLater()
+        QThreadPool.globalInstance().waitForDone()
+    finally:
+        metrics.configure(False, log_dir=None)
+        shared_cache.warm.configure(0)
+        shared_cache.clear()
+
+
+def test_set_hot_keeps_keys_any_owner_needs(app):
+    cache = PixmapCache()
+    for name in ('a', 'b', 'c'):
+        cache.put(key(name), make_pixmap(), 'left')
+    cache.set_hot('right', [key('b')])
+    assert list(cache.entries) == [key('a'), key('b'), key('c')]  # left 尚未登记热窗口
+    cache.set_hot('left', [key('a')])
+    assert list(cache.entries) == [key('a'), key('b')]
+    assert cache.demotions == 1
+
+
+def test_cache_key_uses_known_mtime(tmp_path):
+    path = str(tmp_path / 'missing.jpg')
+    assert image_cache_key(path, 400, 123) == (os.path.normcase(os.path.abspath(path)), 123, 400)
+    assert image_cache_key(path, 400)[1] == 0  # 文件不存在时只能得到 0
@@ -0,0 +1,40 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtGui import QColor, QImage
+
+from disk_cache import DiskCache, prune_directory
+
+
+def write(path, size, mtime):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_removes_oldest_and_skips_temporary_files(tmp_path):
+    write(tmp_path / 'old.jpg', 100, 1)
+    write(tmp_path / 'new.jpg', 100, 2)
+    write(tmp_path / 'writing.jpg.123.456.tmp', 500, 0)
+    assert prune_directory(str(tmp_path), 150) == 100
+    assert sorted(os.listdir(tmp_path)) == ['new.jpg', 'writing.jpg.123.456.tmp']
+
+
+def test_prune_missing_directory(tmp_path):
+    assert prune_directory(str(tmp_path / 'missing'), 100) == 0
+
+
+def test_store_counts_overwrites_once(tmp_path):
+    source = tmp_path / 'source.png'
+    image = QImage(64, 48, QImage.Format_RGB32)
+    image.fill(QColor('#96CEB4'))
+    image.save(str(source))
+    cache = DiskCache(str(tmp_path / 'cache'))
+    for _ in range(3):
+        assert cache.store(str(source), 32, image.scaledToWidth(32))
+    files = os.listdir(cache.directory)
+    assert len(files) == 1
+    assert cache.total_bytes == os.path.getsize(os.path.join(cache.directory, files[0]))
+    assert cache.contains(str(source), 32)
+    assert cache.load(str(source), 32).width() == 32
@@ -0,0 +1,63 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from governor import QualityGovernor
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+class FakePager(QObject):
+    animation_frame = pyqtSignal()
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, animating='smooth', slide_duration=300, prefetch_depth=1):
+        super().__init__()
+        self.scaling = {'animating': animating, 'idle': 'smooth'}
+        self.slide_duration = slide_duration
+        self.prefetch_depth = prefetch_depth
+
+    def is_busy(self):
+        return True
+
+
+def levels(governor, step):
+    result = []
+    level = governor.next_level(step)
+    while level is not None:
+        governor.set_level(level)
+        result.append(level)
+        if level == 0:
+            break
+        level = governor.next_level(step)
+    return result
+
+
+def test_levels_stack_and_restore(app):
+    pager = FakePager()
+    governor = QualityGovernor([pager])
+    assert levels(governor, 1) == [1, 2, 3]
+    assert pager.scaling['animating'] == 'fast'
+    assert pager.slide_duration == 180 and pager.prefetch_depth == 0
+    assert levels(governor, -1) == [2, 1, 0]
+    assert pager.scaling['animating'] == 'smooth'
+    assert pager.slide_duration == 300 and pager.prefetch_depth == 1
+
+
+def test_skips_levels_already_in_effect(app):
+    # 翻页时已是快速缩放、不预取：只剩缩短动画一级有效
+    pager = FakePager(animating='fast', prefetch_depth=0)
+    governor = QualityGovernor([pager])
+    assert levels(governor, 1) == [2]
+    assert levels(governor, -1) == [0]
+
+    # 只要有一个分页器受影响，该等级就有效
+    governor = QualityGovernor([pager, FakePager()])
+    assert levels(governor, 1) == [1, 2, 3]
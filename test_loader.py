@@ -0,0 +1,45 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from loader import EmitGuard
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+class Receiver(QObject):
+    done = pyqtSignal(int)
+
+
+def test_emit_guard_emits_while_alive(app):
+    receiver = Receiver()
+    received = []
+    receiver.done.connect(received.append)
+    guard = EmitGuard(receiver)
+    assert guard.emit('done', 7)
+    assert received == [7]
+
+
+def test_emit_guard_drops_after_delete(app):
+    receiver = Receiver()
+    guard = EmitGuard(receiver)
+    sip.delete(receiver)
+    assert guard.closed
+    assert not guard.emit('done', 1)
+
+
+def test_emit_guard_drops_when_wrapper_already_deleted(app):
+    receiver = Receiver()
+    guard = EmitGuard(receiver)
+    receiver.destroyed.disconnect()  # 模拟 destroyed 尚未处理
+    sip.delete(receiver)
+    assert not guard.emit('done', 1)
+    assert guard.closed
@@ -0,0 +1,114 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtGui import QColor, QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+import shared_store
+from shared_store import SharedImageStore
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def source(tmp_path):
+    image = QImage(64, 48, QImage.Format_RGB32)
+    image.fill(QColor('#FFEAA7'))
+    path = str(tmp_path / 'source.png')
+    image.save(path)
+    return path, image
+
+
+def mapping_of(store, source_path, width):
+    return store.mappings.get(store.entry_path(source_path, width))
+
+
+def test_store_and_load_round_trip(app, tmp_path, source):
+    path, image = source
+    store = SharedImageStore(str(tmp_path / 'shared'))
+    mapped = store.store(path, 64, image)
+    assert mapped.size() == image.size()
+    assert mapped.pixel(10, 10) == image.pixel(10, 10)
+    assert store.owns(mapped)
+
+    # 另一个实例（相当于另一个进程）直接映射同一个文件
+    other = SharedImageStore(store.directory)
+    loaded = other.load(path, 64)
+    assert loaded.pixel(63, 47) == image.pixel(63, 47)
+    assert other.owns(loaded)
+    assert other.load(path, 32).isNull()
+
+
+def test_owns_with_device_pixel_ratio(app, tmp_path, source):
+    path, image = source
+    store = SharedImageStore(str(tmp_path / 'shared'))
+    mapped = store.store(path, 64, image)
+
+    pixmap = QPixmap.fromImage(mapped)
+    pixmap.setDevicePixelRatio(1.0)
+    assert store.owns(pixmap)  # 直接使用映射的内存
+
+    # 设置其他比例时 QPixmap 会复制像素，不再引用映射，也就不需要计数
+    scaled = QPixmap.fromImage(mapped)
+    scaled.setDevicePixelRatio(2.0)
+    assert not store.owns(scaled)
+    assert not store.owns(QPixmap.fromImage(image))
+    assert not store.owns(QPixmap())
+
+
+def test_acquire_release_counts(app, tmp_path, source):
+    path, image = source
+    store = SharedImageStore(str(tmp_path / 'shared'))
+    pixmap = QPixmap.fromImage(store.store(path, 64, image))
+    mapping = mapping_of(store, path, 64)
+    store.acquire(pixmap)
+    store.acquire(pixmap)
+    store.acquire(QPixmap.fromImage(image))  # 不是映射的图片，忽略
+    assert mapping.refs == 2
+    store.release(pixmap)
+    assert mapping.refs == 1
+    assert mapping_of(store, path, 64) is mapping
+
+
+def test_unmap_only_after_refs_and_grace(app, tmp_path, source):
+    path, image = source
+    store = SharedImageStore(str(tmp_path / 'shared'))
+    pixmap = QPixmap.fromImage(store.store(path, 64, image))
+    mapping = mapping_of(store, path, 64)
+    store.acquire(pixmap)
+
+    # 仍有引用：超过宽限时间也保留
+    mapping.loaded_at -= shared_store.UNMAP_GRACE_S + 1
+    store.prune()
+    assert mapping_of(store, path, 64) is mapping
+
+    # 引用归零但刚刚读取过：保留到宽限时间之后
+    mapping.loaded_at += shared_store.UNMAP_GRACE_S + 1
+    store.release(pixmap)
+    assert mapping.refs == 0
+    assert mapping_of(store, path, 64) is mapping
+
+    del pixmap
+    mapping.loaded_at -= shared_store.UNMAP_GRACE_S + 1
+    store.prune()
+    assert mapping_of(store, path, 64) is None
+    assert mapping.address not in store.addresses
+
+    # 文件仍在共享目录中，可以重新映射
+    assert store.load(path, 64).pixel(0, 0) == image.pixel(0, 0)
+
+
+def test_prune_ignores_files_being_written(app, tmp_path, source):
+    path, image = source
+    store = SharedImageStore(str(tmp_path / 'shared'), max_bytes=0)
+    store.store(path, 64, image)
+    tmp_file = os.path.join(store.directory, 'other.raw.1.2.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(b'x' * 10)
+    store.prune()
+    assert os.listdir(store.directory) == ['other.raw.1.2.tmp']
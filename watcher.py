@@ -0,0 +1,114 @@
+import os
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+from album_index import scan_files
+from loader import EmitGuard
+
+
+def list_directories(folder_path, recursive=False):
+    """需要监视的文件夹：相册文件夹，递归时包括所有非隐藏的子文件夹"""
+    directories = [folder_path]
+    if recursive:
+        for root, dirs, files in os.walk(folder_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            directories.extend(os.path.join(root, d) for d in dirs)
+    return [d for d in directories if os.path.isdir(d)]
+
+
+class ScanTask(QRunnable):
+    """在线程池中扫描相册文件夹，网络共享上的扫描不阻塞 GUI 线程"""
+
+    def __init__(self, watcher):
+        super().__init__()
+        # 由 AlbumWatcher 持有引用
+        self.setAutoDelete(False)
+        self.watcher = watcher
+        self.folder_path = watcher.folder_path
+        self.recursive = watcher.recursive
+        self.guard = watcher.guard
+
+    def run(self):
+        if self.guard.closed:
+            return
+        snapshot = scan_files(self.folder_path, self.recursive)
+        directories = list_directories(self.folder_path, self.recursive)
+        self.guard.emit('scanned', snapshot, directories)
+
+
+class AlbumWatcher(QObject):
+    """监视相册文件夹，把增加、删除、修改的图片合并后以差异的形式通知
+
+    目录变化由 QFileSystemWatcher 触发；原地覆盖文件内容在部分平台上不会触发目录通知，
+    因此另外按 poll_interval_ms 定期对比一次（为 0 时关闭轮询）。
+    扫描在线程池中进行，GUI 线程只对比结果。
+    """
+
+    # 新增、删除、修改的图片路径列表
+    changed = pyqtSignal(list, list, list)
+    # 工作线程 -> GUI 线程：扫描结果和需要监视的文件夹
+    scanned = pyqtSignal(object, list)
+
+    def __init__(self, folder_path, debounce_ms=1000, poll_interval_ms=10000,
+                 recursive=False, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.recursive = recursive
+        self.snapshot = None  # 上一次扫描的结果，第一次扫描完成前为 None
+        self.scan_task = None
+        self.rescan_pending = False
+        self.guard = EmitGuard(self)
+        self.scanned.connect(self.on_scanned)
+
+        # 编辑人员批量拷贝文件时会连续触发很多次，停止变化后再统一扫描
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.rescan)
+
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(lambda path: self.debounce_timer.start())
+
+        self.poll_timer = QTimer(self)
+        if poll_interval_ms > 0:
+            self.poll_timer.timeout.connect(self.rescan)
+            self.poll_timer.start(poll_interval_ms)
+        # 第一次扫描作为对比的基准
+        self.rescan()
+
+    def watch_directories(self, directories):
+        """把相册文件夹（递归时包括子文件夹）加入监视，新建或重新创建的文件夹也会补上"""
+        watched = set(self.fs_watcher.directories())
+        missing = [d for d in directories if d not in watched]
+        if missing:
+            self.fs_watcher.addPaths(missing)
+
+    def rescan(self):
+        """在线程池中重新扫描；上一次扫描尚未完成时，完成后再扫描一次"""
+        if self.scan_task is not None:
+            self.rescan_pending = True
+            return
+        self.rescan_pending = False
+        self.scan_task = ScanTask(self)
+        QThreadPool.globalInstance().start(self.scan_task)
+
+    def on_scanned(self, snapshot, directories):
+        """与上一次结果对比，有变化时发出 changed 信号"""
+        self.scan_task = None
+        self.watch_directories(directories)
+        if self.snapshot is None:
+            self.snapshot = snapshot
+        else:
+            self.diff(snapshot)
+        if self.rescan_pending:
+            self.rescan()
+
+    def diff(self, snapshot):
+        """对比扫描结果，得到新增、删除和修改的图片"""
+        added = sorted(path for path in snapshot if path not in self.snapshot)
+        removed = sorted(path for path in self.snapshot if path not in snapshot)
+        modified = sorted(path for path, stat in snapshot.items()
+                          if path in self.snapshot and self.snapshot[path] != stat)
+        self.snapshot = snapshot
+        if added or removed or modified:
+            self.changed.emit(added, removed, modified)